@@ -5,16 +5,70 @@ Analyzes downloaded Garmin activity data and generates statistics.
 """
 
 import os
+import sys
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
 
 
 # Configuration
 DATA_DIR = Path(os.getenv('DATA_DIR', './data'))
 ACTIVITIES_CSV = DATA_DIR / 'activities.csv'
+ACTIVITIES_CACHE = DATA_DIR / 'activities.pkl'
+NUMERIC_COLUMNS = ('distanceKm', 'durationMin', 'calories', 'averageHR', 'maxHR', 'paceMinPerKm')
+USECOLS = ('activityId', 'activityName', 'activityType', 'startTimeLocal') + NUMERIC_COLUMNS
+OVERALL_STAT_FUNCS = {
+    'distanceKm': ['sum', 'mean', 'max'],
+    'durationMin': ['sum', 'mean'],
+    'calories': ['sum', 'mean'],
+    'averageHR': ['mean', 'count'],
+    'maxHR': ['max'],
+}
+MAX_BAR_WIDTH = 40
+MAX_DISPLAY_PACE = 100  # min/km; slower averages come from stationary/zero-speed records
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def read_activities_csv():
+    """
+    Parse activities.csv into a DataFrame.
+    
+    The parsed frame is pickled next to the CSV and reused while it is newer
+    than both the CSV and this module, so repeat runs skip text parsing.
+    """
+    import pandas as pd
+    import numpy as np
+    
+    source_mtime = max(ACTIVITIES_CSV.stat().st_mtime, Path(__file__).stat().st_mtime)
+    if ACTIVITIES_CACHE.exists() and ACTIVITIES_CACHE.stat().st_mtime >= source_mtime:
+        try:
+            return pd.read_pickle(ACTIVITIES_CACHE)
+        except Exception:
+            pass  # Unreadable cache - rebuild it from the CSV
+    
+    # Only parse the columns the analyses use, with numeric dtypes fixed up front
+    df = pd.read_csv(ACTIVITIES_CSV, usecols=lambda c: c in USECOLS,
+                     dtype={col: 'float64' for col in NUMERIC_COLUMNS})
+    
+    # Store metric columns as contiguous float64 buffers for the NumPy reductions below
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+    
+    if 'startTimeLocal' in df.columns:
+        df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'])
+    
+    # Temp file + rename: analysis stages run side by side and may rebuild the
+    # cache at the same time, and a reader must never see a half-written pickle
+    tmp_path = ACTIVITIES_CACHE.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, ACTIVITIES_CACHE)
+    except OSError as e:
+        print(f"  Warning: Could not write cache {ACTIVITIES_CACHE}: {e}")
+        tmp_path.unlink(missing_ok=True)
+    
+    return df
 
 
 def load_activities():
@@ -25,93 +79,139 @@ def load_activities():
         return None
     
     print(f"Loading data from {ACTIVITIES_CSV}...")
-    df = pd.read_csv(ACTIVITIES_CSV)
+    # pandas is only imported once we know there is data to load
+    import pandas as pd
+    
+    df = read_activities_csv()
     
-    # Convert date column
+    # Low-cardinality labels as categoricals so groupby/value_counts work on integer codes
+    if 'activityType' in df.columns:
+        df['activityType'] = df['activityType'].astype('category')
+    
+    # Derive date columns
     if 'startTimeLocal' in df.columns:
-        df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'])
         df['date'] = df['startTimeLocal'].dt.date
         df['month'] = df['startTimeLocal'].dt.to_period('M')
-        df['week'] = df['startTimeLocal'].dt.to_period('W')
+        df['dayOfWeek'] = pd.Categorical(df['startTimeLocal'].dt.day_name(),
+                                         categories=DAY_ORDER, ordered=True)
     
     print(f"✓ Loaded {len(df)} activities")
     return df
 
 
+def format_pace(pace):
+    """Format a pace in decimal minutes per km as M:SS."""
+    minutes, seconds = divmod(round(pace * 60), 60)
+    return f"{int(minutes)}:{int(seconds):02d}"
+
+
+def write_lines(lines):
+    """Write a section's buffered lines to stdout in a single call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
 def analyze_overall_stats(df):
     """Calculate overall statistics."""
-    print("\n" + "="*60)
-    print("OVERALL STATISTICS")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("OVERALL STATISTICS")
+    out("="*60)
     
     # Total activities
-    print(f"\nTotal Activities: {len(df)}")
+    out(f"\nTotal Activities: {len(df)}")
     
     # Activity types breakdown
     if 'activityType' in df.columns:
-        print("\nActivity Types:")
-        for activity_type, count in df['activityType'].value_counts().items():
-            print(f"  {activity_type}: {count}")
+        out("\nActivity Types:")
+        # Categorical value_counts breaks ties in category (alphabetical) order;
+        # list tied types in order of first appearance instead
+        activity_types = df['activityType']
+        codes = activity_types.cat.codes.unique()
+        first_seen = activity_types.cat.categories[codes[codes >= 0]]
+        type_counts = (activity_types.value_counts(sort=False)
+                       .reindex(first_seen)
+                       .sort_values(ascending=False, kind='stable'))
+        out("\n".join(f"  {activity_type}: {count}"
+                       for activity_type, count in zip(type_counts.index, type_counts.to_numpy())))
+    
+    # Compute only the reductions each column needs, in one aggregation call
+    stat_funcs = {col: funcs for col, funcs in OVERALL_STAT_FUNCS.items() if col in df.columns}
+    if not stat_funcs:
+        write_lines(lines)
+        return
+    stats = df.agg(stat_funcs)
     
     # Distance stats
-    if 'distanceKm' in df.columns:
-        total_distance = df['distanceKm'].sum()
-        avg_distance = df['distanceKm'].mean()
-        max_distance = df['distanceKm'].max()
-        print(f"\nDistance:")
-        print(f"  Total: {total_distance:.2f} km")
-        print(f"  Average per activity: {avg_distance:.2f} km")
-        print(f"  Longest activity: {max_distance:.2f} km")
+    if 'distanceKm' in stats:
+        out(f"\nDistance:")
+        out(f"  Total: {stats.at['sum', 'distanceKm']:.2f} km")
+        out(f"  Average per activity: {stats.at['mean', 'distanceKm']:.2f} km")
+        out(f"  Longest activity: {stats.at['max', 'distanceKm']:.2f} km")
     
     # Duration stats
-    if 'durationMin' in df.columns:
-        total_time = df['durationMin'].sum()
-        avg_time = df['durationMin'].mean()
-        print(f"\nDuration:")
-        print(f"  Total: {total_time/60:.2f} hours")
-        print(f"  Average per activity: {avg_time:.2f} minutes")
+    if 'durationMin' in stats:
+        out(f"\nDuration:")
+        out(f"  Total: {stats.at['sum', 'durationMin']/60:.2f} hours")
+        out(f"  Average per activity: {stats.at['mean', 'durationMin']:.2f} minutes")
     
     # Calories
-    if 'calories' in df.columns:
-        total_calories = df['calories'].sum()
-        avg_calories = df['calories'].mean()
-        print(f"\nCalories:")
-        print(f"  Total: {total_calories:,.0f} kcal")
-        print(f"  Average per activity: {avg_calories:.0f} kcal")
+    if 'calories' in stats:
+        out(f"\nCalories:")
+        out(f"  Total: {stats.at['sum', 'calories']:,.0f} kcal")
+        out(f"  Average per activity: {stats.at['mean', 'calories']:.0f} kcal")
     
     # Heart rate stats
-    if 'averageHR' in df.columns and df['averageHR'].notna().any():
-        avg_hr = df['averageHR'].mean()
-        max_hr = df['maxHR'].max() if 'maxHR' in df.columns else None
-        print(f"\nHeart Rate:")
-        print(f"  Average: {avg_hr:.0f} bpm")
+    if 'averageHR' in stats and stats.at['count', 'averageHR'] > 0:
+        avg_hr = stats.at['mean', 'averageHR']
+        max_hr = stats.at['max', 'maxHR'] if 'maxHR' in stats else None
+        out(f"\nHeart Rate:")
+        out(f"  Average: {avg_hr:.0f} bpm")
         if max_hr:
-            print(f"  Maximum recorded: {max_hr:.0f} bpm")
+            out(f"  Maximum recorded: {max_hr:.0f} bpm")
+    
+    write_lines(lines)
 
 
 def analyze_by_activity_type(df):
     """Analyze statistics by activity type."""
+    import pandas as pd
+    
     if 'activityType' not in df.columns:
         return
     
-    print("\n" + "="*60)
-    print("STATISTICS BY ACTIVITY TYPE")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("STATISTICS BY ACTIVITY TYPE")
+    out("="*60)
     
-    for activity_type in df['activityType'].unique():
-        activity_df = df[df['activityType'] == activity_type]
-        print(f"\n{activity_type}:")
-        print(f"  Count: {len(activity_df)}")
+    # One hash-partition pass over all rows instead of a boolean mask per type
+    aggregations = {'sessions': ('activityType', 'size')}
+    if 'distanceKm' in df.columns:
+        aggregations['dist_sum'] = ('distanceKm', 'sum')
+        aggregations['dist_mean'] = ('distanceKm', 'mean')
+    if 'paceMinPerKm' in df.columns:
+        aggregations['pace_mean'] = ('paceMinPerKm', 'mean')
+    by_type = df.groupby('activityType', sort=False, observed=True).agg(**aggregations)
+    
+    for row in by_type.itertuples():
+        out(f"\n{row.Index}:")
+        out(f"  Count: {row.sessions}")
         
         if 'distanceKm' in df.columns:
-            print(f"  Total Distance: {activity_df['distanceKm'].sum():.2f} km")
-            print(f"  Avg Distance: {activity_df['distanceKm'].mean():.2f} km")
+            out(f"  Total Distance: {row.dist_sum:.2f} km")
+            out(f"  Avg Distance: {row.dist_mean:.2f} km")
         
-        if 'paceMinPerKm' in df.columns and activity_df['paceMinPerKm'].notna().any():
-            avg_pace = activity_df['paceMinPerKm'].mean()
+        if 'paceMinPerKm' in df.columns:
+            avg_pace = row.pace_mean
             # Only show pace if it's a reasonable value (not infinity or too slow)
-            if avg_pace < 100 and not pd.isna(avg_pace):
-                print(f"  Avg Pace: {int(avg_pace)}:{int((avg_pace % 1) * 60):02d} min/km")
+            if avg_pace < MAX_DISPLAY_PACE and not pd.isna(avg_pace):
+                out(f"  Avg Pace: {format_pace(avg_pace)} min/km")
+    
+    write_lines(lines)
 
 
 def analyze_trends(df):
@@ -119,9 +219,12 @@ def analyze_trends(df):
     if 'month' not in df.columns:
         return
     
-    print("\n" + "="*60)
-    print("MONTHLY TRENDS")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("MONTHLY TRENDS")
+    out("="*60)
     
     # Group by month
     monthly = df.groupby('month').agg({
@@ -130,88 +233,128 @@ def analyze_trends(df):
         'durationMin': 'sum'
     }).rename(columns={'activityId': 'count'})
     
-    print("\n{:<15} {:<10} {:<15} {:<15}".format(
+    out("\n{:<15} {:<10} {:<15} {:<15}".format(
         "Month", "Count", "Distance (km)", "Time (hrs)"
     ))
-    print("-" * 60)
-    
-    for month, row in monthly.iterrows():
-        print("{:<15} {:<10} {:<15.2f} {:<15.2f}".format(
-            str(month),
-            int(row['count']),
-            row['distanceKm'],
-            row['durationMin'] / 60
+    out("-" * 60)
+    
+    # Iterate plain arrays rather than iterrows() to avoid boxing each row
+    months = monthly.index.astype(str).to_numpy()
+    counts = monthly['count'].to_numpy()
+    distances = monthly['distanceKm'].to_numpy()
+    hours = monthly['durationMin'].to_numpy() / 60
+    for i in range(len(monthly)):
+        out("{:<15} {:<10} {:<15.2f} {:<15.2f}".format(
+            months[i],
+            int(counts[i]),
+            distances[i],
+            hours[i]
         ))
     
     # Calculate growth
     if len(monthly) >= 2:
-        first_month_dist = monthly['distanceKm'].iloc[0]
-        last_month_dist = monthly['distanceKm'].iloc[-1]
-        growth = ((last_month_dist - first_month_dist) / first_month_dist) * 100
-        print(f"\nDistance change from first to last month: {growth:+.1f}%")
+        first_month_dist = distances[0]
+        last_month_dist = distances[-1]
+        # A first month with no distance (e.g. strength-only) has no meaningful baseline
+        if first_month_dist > 0:
+            growth = ((last_month_dist - first_month_dist) / first_month_dist) * 100
+            out(f"\nDistance change from first to last month: {growth:+.1f}%")
+        else:
+            out("\nDistance change from first to last month: N/A (no distance in first month)")
+    
+    write_lines(lines)
+
+
+def record_position(df, column, arg_reduction):
+    """
+    Row position chosen by a nan-aware arg reduction (np.nanargmax/np.nanargmin).
+    
+    Returns None when the column is missing, empty or entirely NaN, so callers
+    need no separate notna().any() scan.
+    """
+    if column not in df.columns:
+        return None
+    try:
+        return int(arg_reduction(df[column].to_numpy(dtype='float64')))
+    except ValueError:
+        return None
 
 
 def analyze_personal_records(df):
     """Find personal records."""
-    print("\n" + "="*60)
-    print("PERSONAL RECORDS")
-    print("="*60)
+    import numpy as np
+    
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("PERSONAL RECORDS")
+    out("="*60)
     
     # Longest distance
-    if 'distanceKm' in df.columns and df['distanceKm'].notna().any():
-        longest_idx = df['distanceKm'].idxmax()
-        longest = df.loc[longest_idx]
-        print(f"\nLongest Distance:")
-        print(f"  {longest['distanceKm']:.2f} km")
+    longest_pos = record_position(df, 'distanceKm', np.nanargmax)
+    if longest_pos is not None:
+        longest = df.iloc[longest_pos]
+        out(f"\nLongest Distance:")
+        out(f"  {longest['distanceKm']:.2f} km")
         if 'activityName' in df.columns:
-            print(f"  Activity: {longest['activityName']}")
+            out(f"  Activity: {longest['activityName']}")
         if 'startTimeLocal' in df.columns:
-            print(f"  Date: {longest['startTimeLocal']}")
+            out(f"  Date: {longest['startTimeLocal']}")
     
     # Fastest pace (running)
-    if 'paceMinPerKm' in df.columns and df['paceMinPerKm'].notna().any():
-        fastest_idx = df['paceMinPerKm'].idxmin()
-        fastest = df.loc[fastest_idx]
+    fastest_pos = record_position(df, 'paceMinPerKm', np.nanargmin)
+    if fastest_pos is not None:
+        fastest = df.iloc[fastest_pos]
         pace = fastest['paceMinPerKm']
-        print(f"\nFastest Pace:")
-        print(f"  {int(pace)}:{int((pace % 1) * 60):02d} min/km")
+        out(f"\nFastest Pace:")
+        out(f"  {format_pace(pace)} min/km")
         if 'distanceKm' in df.columns:
-            print(f"  Distance: {fastest['distanceKm']:.2f} km")
+            out(f"  Distance: {fastest['distanceKm']:.2f} km")
         if 'startTimeLocal' in df.columns:
-            print(f"  Date: {fastest['startTimeLocal']}")
+            out(f"  Date: {fastest['startTimeLocal']}")
     
     # Most calories burned
-    if 'calories' in df.columns and df['calories'].notna().any():
-        max_calories_idx = df['calories'].idxmax()
-        max_cal = df.loc[max_calories_idx]
-        print(f"\nMost Calories Burned:")
-        print(f"  {max_cal['calories']:,.0f} kcal")
+    max_cal_pos = record_position(df, 'calories', np.nanargmax)
+    if max_cal_pos is not None:
+        max_cal = df.iloc[max_cal_pos]
+        out(f"\nMost Calories Burned:")
+        out(f"  {max_cal['calories']:,.0f} kcal")
         if 'activityName' in df.columns:
-            print(f"  Activity: {max_cal['activityName']}")
+            out(f"  Activity: {max_cal['activityName']}")
         if 'startTimeLocal' in df.columns:
-            print(f"  Date: {max_cal['startTimeLocal']}")
+            out(f"  Date: {max_cal['startTimeLocal']}")
+    
+    write_lines(lines)
 
 
 def analyze_weekly_patterns(df):
     """Analyze weekly activity patterns."""
-    if 'startTimeLocal' not in df.columns:
+    # dayOfWeek is derived once in load_activities as an ordered categorical
+    if 'dayOfWeek' not in df.columns:
         return
     
-    print("\n" + "="*60)
-    print("WEEKLY PATTERNS")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("WEEKLY PATTERNS")
+    out("="*60)
+    
+    # Count by day of week (category order, empty days included)
+    day_counts = df['dayOfWeek'].value_counts(sort=False)
     
-    # Add day of week
-    df['dayOfWeek'] = pd.to_datetime(df['startTimeLocal']).dt.day_name()
+    # Scale bars so the busiest day is at most MAX_BAR_WIDTH characters
+    days = day_counts.index
+    counts = day_counts.to_numpy()
+    scale = min(1.0, MAX_BAR_WIDTH / max(counts.max(initial=0), 1))
     
-    # Count by day of week
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_counts = df['dayOfWeek'].value_counts().reindex(day_order, fill_value=0)
+    out("\nActivities by Day of Week:")
+    for i in range(len(counts)):
+        bar = "█" * int(round(counts[i] * scale))
+        out(f"  {days[i]:<10}: {bar} ({counts[i]})")
     
-    print("\nActivities by Day of Week:")
-    for day, count in day_counts.items():
-        bar = "█" * int(count)
-        print(f"  {day:<10}: {bar} ({count})")
+    write_lines(lines)
 
 
 def main():
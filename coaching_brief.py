@@ -3,6 +3,9 @@
 Coaching Brief Generator - Elite-level training analysis
 Implements Gemini's recommendations for comprehensive athlete monitoring
 """
+import contextlib
+import hashlib
+import io
 import json
 import pandas as pd
 import numpy as np
@@ -10,11 +13,69 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import periodization
 import os
+import sys
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables for FTP
 load_dotenv()
 
+HR_ZONE_KEYS = [f'hrTimeInZone_{zone}' for zone in range(1, 6)]
+ACTIVITY_METRICS = [
+    'duration', 'distance', 'averageHR', 'maxHR', 'averageSpeed', 'avgStrokes',
+    'max20MinPower', 'avgPower', 'normPower'
+] + HR_ZONE_KEYS
+# activities.csv columns used by the brief, with their parse dtypes
+CSV_DTYPES = {
+    'activityName': 'object',
+    'activityType': 'category',
+    'duration': 'float32',
+    'averageHR': 'float32',
+    'paceMinPerKm': 'float32',
+}
+
+# Parsed JSON files keyed by path: (mtime_ns, data)
+JSON_CACHE = {}
+
+COACHING_BRIEF_JSON = Path("./data/coaching_brief.json")
+# Last generated brief, reused while brief_fingerprint() is unchanged
+BRIEF_CACHE = Path("./data/.coaching_brief_cache.json")
+BRIEF_INPUTS = [
+    Path("./data/activities.json"),
+    Path("./data/activities.csv"),
+    Path("./data/sleep.json"),
+    Path("./data/wellness.json"),
+    Path("./data/training_stats.json"),
+    Path(__file__),
+    Path(periodization.__file__),
+]
+BRIEF_SETTINGS = ['ANALYSIS_DAYS', 'FTP', 'RACE_DATE', 'RACE_TYPE', 'RACE_PRIORITY']
+
+
+def read_json(path):
+    """
+    Parse a JSON data file, reusing the previous result while its mtime is unchanged.
+    
+    The returned object is shared between calls, so callers must not modify it.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = JSON_CACHE.get(str(path))
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    JSON_CACHE[str(path)] = (mtime_ns, data)
+    return data
+
 
 def load_data():
     """Load activities from JSON (richer data) and CSV"""
@@ -24,12 +85,18 @@ def load_data():
     if not json_path.exists() or not csv_path.exists():
         raise FileNotFoundError("Data files not found. Run download first.")
     
-    with open(json_path, 'r') as f:
-        activities_json = json.load(f)
+    activities_json = read_json(json_path)
     
-    df = pd.read_csv(csv_path)
-    df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'])
-    df = df.sort_values('startTimeLocal').reset_index(drop=True)
+    # Only parse the columns the brief uses, with known dtypes instead of inference
+    df = pd.read_csv(
+        csv_path,
+        usecols=lambda column: column in CSV_DTYPES or column == 'startTimeLocal',
+        dtype=CSV_DTYPES,
+        parse_dates=['startTimeLocal']
+    )
+    # The download already writes activities in date order most of the time
+    if not df['startTimeLocal'].is_monotonic_increasing:
+        df = df.sort_values('startTimeLocal').reset_index(drop=True)
     
     return df, activities_json
 
@@ -42,8 +109,7 @@ def load_sleep_data():
         return None
     
     try:
-        with open(sleep_path, 'r') as f:
-            sleep_data = json.load(f)
+        sleep_data = read_json(sleep_path)
         return sleep_data if sleep_data else None
     except Exception as e:
         print(f"Warning: Could not load sleep data: {e}")
@@ -58,8 +124,7 @@ def load_wellness_data():
         return None
     
     try:
-        with open(wellness_path, 'r') as f:
-            wellness_data = json.load(f)
+        wellness_data = read_json(wellness_path)
         return wellness_data if wellness_data else None
     except Exception as e:
         print(f"Warning: Could not load wellness data: {e}")
@@ -74,15 +139,58 @@ def load_training_stats():
         return None
     
     try:
-        with open(stats_path, 'r') as f:
-            stats_data = json.load(f)
+        stats_data = read_json(stats_path)
         return stats_data if stats_data else None
     except Exception as e:
         print(f"Warning: Could not load training stats: {e}")
         return None
 
 
-def calculate_ftp_from_activities(activities_json):
+def activities_to_frame(activities_json):
+    """
+    Convert the raw activity dicts from activities.json into a columnar DataFrame.
+    
+    The list of dicts is walked once here; the per-metric calculations below
+    then work on columns instead of each re-reading every dict.
+    """
+    # One tuple per activity; map() runs the metric lookups without a Python-level loop
+    records = []
+    for activity in activities_json:
+        get = activity.get
+        records.append((
+            (get('activityType') or {}).get('typeKey', ''),
+            get('startTimeLocal') or '',
+            get('activityName', 'Unknown'),
+            *map(get, ACTIVITY_METRICS)
+        ))
+    
+    activities = pd.DataFrame.from_records(
+        records, columns=['typeKey', 'startTimeLocal', 'activityName'] + ACTIVITY_METRICS
+    )
+    # Non-numeric or missing metrics become NaN; missing zone times count as 0.
+    # float32 is exact for these second/metre/bpm values and halves the bytes
+    # scanned; reductions below accumulate in float64.
+    activities[ACTIVITY_METRICS] = (
+        activities[ACTIVITY_METRICS].apply(pd.to_numeric, errors='coerce').astype(np.float32)
+    )
+    activities[HR_ZONE_KEYS] = activities[HR_ZONE_KEYS].fillna(0)
+    activities['typeKey'] = activities['typeKey'].astype('category')
+    return activities
+
+
+def type_mask(activity_types, pattern, case=True):
+    """
+    Boolean mask of rows whose categorical activity type matches a regex pattern.
+    
+    The pattern is only tested against the handful of distinct categories,
+    then rows are selected by category code.
+    """
+    categories = activity_types.cat.categories
+    matching = categories[categories.astype(str).str.contains(pattern, case=case)]
+    return activity_types.isin(matching)
+
+
+def calculate_ftp_from_activities(activities):
     """
     Calculate FTP (Functional Threshold Power) from activity power data or .env config.
     
@@ -106,40 +214,29 @@ def calculate_ftp_from_activities(activities_json):
             pass
     
     # Fall back to calculating from activities
-    cycling_with_power = []
-    for activity in activities_json:
-        activity_type = activity.get('activityType', {}).get('typeKey', '').lower()
-        if 'cycling' in activity_type:
-            max_20min = activity.get('max20MinPower')
-            if max_20min and max_20min > 0:
-                cycling_with_power.append({
-                    'date': activity.get('startTimeLocal', '')[:10],
-                    'name': activity.get('activityName', 'Unknown'),
-                    'max_20min_power': max_20min,
-                    'avg_power': activity.get('avgPower', 0),
-                    'norm_power': activity.get('normPower', 0)
-                })
-    
-    if not cycling_with_power:
+    is_cycling = type_mask(activities['typeKey'], 'cycling', case=False)
+    cycling_with_power = activities[is_cycling & (activities['max20MinPower'] > 0)]
+    
+    if cycling_with_power.empty:
         return None
     
     # Find best 20-minute power
-    best_activity = max(cycling_with_power, key=lambda x: x['max_20min_power'])
-    best_20min = best_activity['max_20min_power']
+    best_activity = cycling_with_power.iloc[np.argmax(cycling_with_power['max20MinPower'].to_numpy())]
+    best_20min = best_activity['max20MinPower']
     estimated_ftp = int(best_20min * 0.95)
     
     return {
         'ftp_watts': estimated_ftp,
         'source': 'Estimated',
         'best_20min_watts': int(best_20min),
-        'best_20min_date': best_activity['date'],
-        'best_20min_workout': best_activity['name'],
+        'best_20min_date': best_activity['startTimeLocal'][:10],
+        'best_20min_workout': best_activity['activityName'],
         'activities_analyzed': len(cycling_with_power),
         'note': 'Estimated from best 20min power. Update FTP=xxx in .env for accurate value.'
     }
 
 
-def calculate_aerobic_decoupling(activity_json):
+def calculate_aerobic_decoupling(activities):
     """
     Calculate aerobic decoupling (Pa:Hr) for steady-state workouts >60 min.
     
@@ -148,144 +245,102 @@ def calculate_aerobic_decoupling(activity_json):
     
     < 5%: Strong aerobic base (ready for intensity)
     > 5%: Aerobic deficiency (needs more Zone 2 volume)
-    """
-    duration_min = activity_json.get('duration', 0) / 60
-    
-    # Only calculate for workouts > 60 minutes
-    if duration_min < 60:
-        return None
     
-    avg_hr = activity_json.get('averageHR', 0)
-    if avg_hr == 0 or avg_hr is None:
-        return None
-    
-    # For cycling: use power if available, else speed
-    activity_type = activity_json.get('activityType', {}).get('typeKey', '')
+    Computed for a whole frame of activities at once; returns an array with
+    one value per row, NaN where decoupling can't be estimated.
+    """
+    duration_min = activities['duration'].to_numpy(dtype=np.float64) / 60
+    avg_hr = activities['averageHR'].to_numpy(dtype=np.float64)
+    max_hr = activities['maxHR'].to_numpy(dtype=np.float64)
+    avg_speed = activities['averageSpeed'].to_numpy(dtype=np.float64)
     
     # Get HR zone times to approximate first/second half distribution
-    zone_times = {
-        'z1': activity_json.get('hrTimeInZone_1', 0),
-        'z2': activity_json.get('hrTimeInZone_2', 0),
-        'z3': activity_json.get('hrTimeInZone_3', 0),
-        'z4': activity_json.get('hrTimeInZone_4', 0),
-        'z5': activity_json.get('hrTimeInZone_5', 0)
-    }
-    
-    total_time = sum(zone_times.values())
-    if total_time == 0:
-        return None
+    total_time = activities[HR_ZONE_KEYS].to_numpy().sum(axis=1, dtype=np.float64)
     
-    # Estimate HR drift by checking if higher zones become more dominant
-    # This is an approximation without time-series data
-    avg_speed = activity_json.get('averageSpeed', 0)
-    max_hr = activity_json.get('maxHR', 0)
-    
-    if avg_speed == 0 or max_hr == 0:
-        return None
+    # Only calculate for workouts > 60 minutes with HR, zone and speed data
+    # (missing metrics are NaN and fail these checks)
+    valid = ((duration_min >= 60) & (avg_hr > 0) & (total_time != 0) &
+             (avg_speed > 0) & (max_hr > 0))
     
     # Simple heuristic: if max HR is significantly higher than avg HR,
     # and workout is long, there's likely some drift
-    hr_range = max_hr - avg_hr
-    
-    # Estimate decoupling based on HR range relative to workout duration
     # This is approximate without time-series data
-    estimated_decoupling = (hr_range / avg_hr) * (duration_min / 120) * 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimated_decoupling = ((max_hr - avg_hr) / avg_hr) * (duration_min / 120) * 100
     
-    return min(estimated_decoupling, 15)  # Cap at 15%
+    return np.where(valid, np.minimum(estimated_decoupling, 15), np.nan)  # Cap at 15%
 
 
-def analyze_hr_zones(df, activities_json):
+def analyze_hr_zones(df, activities):
     """
     Analyze time in HR zones to check 80/20 distribution.
     
     Ideal: 80% in Zone 1-2 (easy aerobic), 20% in Zone 3-5 (moderate-hard)
+    
+    Returns percentages as floats (None without zone data); use
+    format_hr_zones() for display.
     """
-    total_z1_z2 = 0
-    total_z3 = 0
-    total_z4_z5 = 0
+    # Column sums over the (activities x 5) zone-time block
+    z1, z2, z3, z4, z5 = activities[HR_ZONE_KEYS].to_numpy().sum(axis=0, dtype=np.float64)
     
-    for activity in activities_json:
-        z1 = activity.get('hrTimeInZone_1', 0) or 0
-        z2 = activity.get('hrTimeInZone_2', 0) or 0
-        z3 = activity.get('hrTimeInZone_3', 0) or 0
-        z4 = activity.get('hrTimeInZone_4', 0) or 0
-        z5 = activity.get('hrTimeInZone_5', 0) or 0
-        
-        total_z1_z2 += (z1 + z2)
-        total_z3 += z3
-        total_z4_z5 += (z4 + z5)
+    total_z1_z2 = z1 + z2
+    total_z3 = z3
+    total_z4_z5 = z4 + z5
     
     total_time = total_z1_z2 + total_z3 + total_z4_z5
     
     if total_time == 0:
-        return {"Z1_2": "N/A", "Z3": "N/A", "Z4_5": "N/A"}
-    
-    z1_z2_pct = (total_z1_z2 / total_time) * 100
-    z3_pct = (total_z3 / total_time) * 100
-    z4_z5_pct = (total_z4_z5 / total_time) * 100
+        return {"Z1_2": None, "Z3": None, "Z4_5": None}
     
     return {
-        "Z1_2": f"{z1_z2_pct:.1f}%",
-        "Z3": f"{z3_pct:.1f}%",
-        "Z4_5": f"{z4_z5_pct:.1f}%"
+        "Z1_2": (total_z1_z2 / total_time) * 100,
+        "Z3": (total_z3 / total_time) * 100,
+        "Z4_5": (total_z4_z5 / total_time) * 100
     }
 
 
-def calculate_swim_swolf(activities_json):
+def format_hr_zones(hr_zones):
+    """Format zone percentages from analyze_hr_zones() as strings like '72.3%'"""
+    return {zone: "N/A" if pct is None else f"{pct:.1f}%" for zone, pct in hr_zones.items()}
+
+
+def calculate_swim_swolf(activities):
     """
     SWOLF = Strokes + Time (per length)
     Lower = better efficiency
     """
-    swim_swolf_values = []
+    swims = activities[(activities['typeKey'] == 'lap_swimming') &
+                       (activities['avgStrokes'] > 0) & (activities['distance'] > 0)]
     
-    for activity in activities_json:
-        if activity.get('activityType', {}).get('typeKey') == 'lap_swimming':
-            avg_strokes = activity.get('avgStrokes', 0)
-            duration_sec = activity.get('duration', 0)
-            distance_m = activity.get('distance', 0)
-            
-            if avg_strokes > 0 and distance_m > 0:
-                # Approximate time per 25m length (assuming 25m pool)
-                num_lengths = distance_m / 25
-                if num_lengths > 0:
-                    time_per_length = duration_sec / num_lengths
-                    swolf = avg_strokes + time_per_length
-                    swim_swolf_values.append(swolf)
+    if swims.empty:
+        return None
     
-    if swim_swolf_values:
-        return np.mean(swim_swolf_values)
-    return None
+    # Approximate time per 25m length (assuming 25m pool)
+    num_lengths = swims['distance'] / 25
+    time_per_length = swims['duration'].fillna(0) / num_lengths
+    swolf = swims['avgStrokes'] + time_per_length
+    return swolf.to_numpy().mean(dtype=np.float64)
 
 
-def calculate_bike_efficiency_factor(df, activities_json):
+def calculate_bike_efficiency_factor(df, activities):
     """
     Efficiency Factor (EF) = Power / Heart Rate
     
     If EF is improving over time, fitness is increasing.
     """
-    bike_activities = []
+    is_bike = type_mask(activities['typeKey'], 'cycling|bike')
+    bikes = activities[is_bike & (activities['averageHR'] > 0) & (activities['averageSpeed'] > 0)]
     
-    for idx, activity in enumerate(activities_json):
-        activity_type = activity.get('activityType', {}).get('typeKey', '')
-        if 'cycling' in activity_type or 'bike' in activity_type:
-            avg_hr = activity.get('averageHR', 0)
-            avg_speed = activity.get('averageSpeed', 0)
-            
-            if avg_hr > 0 and avg_speed > 0:
-                # Use speed as proxy for power (without actual power meter data)
-                ef = avg_speed / avg_hr
-                date = activity.get('startTimeLocal', '')
-                bike_activities.append({'date': date, 'ef': ef})
+    # Use speed as proxy for power (without actual power meter data)
+    bike_ef = (bikes['averageSpeed'] / bikes['averageHR']).to_numpy()
     
-    if len(bike_activities) < 2:
+    if len(bike_ef) < 2:
         return "Insufficient data"
     
     # Check trend: compare first 3 vs last 3 activities
-    first_batch = bike_activities[:min(3, len(bike_activities)//2)]
-    last_batch = bike_activities[-min(3, len(bike_activities)//2):]
-    
-    avg_first = np.mean([a['ef'] for a in first_batch])
-    avg_last = np.mean([a['ef'] for a in last_batch])
+    batch_size = min(3, len(bike_ef) // 2)
+    avg_first = bike_ef[:batch_size].mean(dtype=np.float64)
+    avg_last = bike_ef[-batch_size:].mean(dtype=np.float64)
     
     if avg_last > avg_first * 1.05:
         return "Improving ↗"
@@ -319,9 +374,11 @@ def calculate_readiness_metrics(df, sleep_data=None, wellness_data=None):
         bb_data = wellness_data.get('body_battery', [])
         if bb_data:
             if isinstance(bb_data, list) and len(bb_data) > 0:
-                bb_values = [item.get('charged', 0) for item in bb_data if isinstance(item, dict)]
-                if bb_values:
-                    body_battery = max(bb_values)  # Peak body battery for the day
+                # Peak body battery for the day
+                body_battery = max(
+                    (item.get('charged', 0) for item in bb_data if isinstance(item, dict)),
+                    default=None
+                )
             elif isinstance(bb_data, dict):
                 body_battery = bb_data.get('charged')
         
@@ -332,10 +389,10 @@ def calculate_readiness_metrics(df, sleep_data=None, wellness_data=None):
     
     # Fall back to activity HR if no wellness data
     if resting_hr is None:
-        recent_df = df[df['averageHR'] > 0].tail(7).copy()
-        all_hr = df[df['averageHR'] > 0]['averageHR']
-        recent_avg_hr = recent_df['averageHR'].mean() if len(recent_df) > 0 else 0
-        overall_avg_hr = all_hr.mean() if len(all_hr) > 0 else 0
+        all_hr = df['averageHR'].to_numpy(dtype=np.float64)
+        all_hr = all_hr[all_hr > 0]
+        recent_avg_hr = all_hr[-7:].mean() if all_hr.size else 0
+        overall_avg_hr = all_hr.mean() if all_hr.size else 0
     
     # Calculate sleep score if data available
     sleep_score = calculate_sleep_score(sleep_data) if sleep_data else None
@@ -377,6 +434,32 @@ def calculate_readiness_metrics(df, sleep_data=None, wellness_data=None):
         }
 
 
+def extract_sleep_score(sleep_entry):
+    """Return the 0-100 sleep score from one Garmin sleep entry, or NaN if it has none"""
+    # Garmin sleep data structure varies, try multiple fields
+    score = None
+    
+    # Try overallSleepScore first (0-100)
+    if 'overallSleepScore' in sleep_entry:
+        score = sleep_entry['overallSleepScore'].get('value')
+    
+    # Try sleepScores object
+    elif 'sleepScores' in sleep_entry:
+        scores_obj = sleep_entry['sleepScores']
+        if 'overall' in scores_obj:
+            score = scores_obj['overall'].get('value')
+    
+    # Try dailySleepDTO structure
+    elif 'dailySleepDTO' in sleep_entry:
+        dto = sleep_entry['dailySleepDTO']
+        if 'sleepScores' in dto:
+            score = dto['sleepScores'].get('overall', {}).get('value')
+    
+    if score and isinstance(score, (int, float)) and 0 <= score <= 100:
+        return score
+    return np.nan
+
+
 def calculate_sleep_score(sleep_data):
     """
     Calculate average sleep score from Garmin sleep data (last 7 days).
@@ -390,32 +473,11 @@ def calculate_sleep_score(sleep_data):
         # Get recent sleep data (last 7 days)
         recent_sleep = sleep_data[:7]
         
-        sleep_scores = []
-        for sleep_entry in recent_sleep:
-            # Garmin sleep data structure varies, try multiple fields
-            score = None
-            
-            # Try overallSleepScore first (0-100)
-            if 'overallSleepScore' in sleep_entry:
-                score = sleep_entry['overallSleepScore'].get('value')
-            
-            # Try sleepScores object
-            elif 'sleepScores' in sleep_entry:
-                scores_obj = sleep_entry['sleepScores']
-                if 'overall' in scores_obj:
-                    score = scores_obj['overall'].get('value')
-            
-            # Try dailySleepDTO structure
-            elif 'dailySleepDTO' in sleep_entry:
-                dto = sleep_entry['dailySleepDTO']
-                if 'sleepScores' in dto:
-                    score = dto['sleepScores'].get('overall', {}).get('value')
-            
-            if score and isinstance(score, (int, float)) and 0 <= score <= 100:
-                sleep_scores.append(score)
+        sleep_scores = np.fromiter((extract_sleep_score(entry) for entry in recent_sleep), dtype=np.float64)
+        sleep_scores = sleep_scores[~np.isnan(sleep_scores)]
         
-        if sleep_scores:
-            avg_score = np.mean(sleep_scores)
+        if sleep_scores.size:
+            avg_score = sleep_scores.mean()
             return f"{avg_score:.0f}/100 (7-day avg, n={len(sleep_scores)})"
         else:
             return "N/A (no valid scores)"
@@ -425,19 +487,30 @@ def calculate_sleep_score(sleep_data):
         return "N/A (parse error)"
 
 
-def calculate_acute_chronic_ratio(df):
+def calculate_training_loads(df):
+    """
+    Acute (last 7 activities) and chronic (last 28) load in minutes,
+    using duration as proxy for load. Both come from one slice of the tail.
+    """
+    durations = df['duration'].tail(28).to_numpy(dtype=np.float64)
+    acute = np.nansum(durations[-7:]) / 60
+    chronic = np.nansum(durations) / 60 if len(df) >= 28 else acute
+    return acute, chronic
+
+
+def calculate_acute_chronic_ratio(df, loads=None):
     """
     ACWR = Acute Load (7 days) / Chronic Load (28 days)
     
     Ideal: 0.8 - 1.3
     > 1.5: High injury risk - back off!
+    
+    loads: optional (acute, chronic) from calculate_training_loads()
     """
     if len(df) < 7:
         return None
     
-    # Use duration as proxy for load
-    acute = df.tail(7)['duration'].sum() / 60  # minutes
-    chronic = df.tail(28)['duration'].sum() / 60 if len(df) >= 28 else acute
+    acute, chronic = loads if loads is not None else calculate_training_loads(df)
     
     if chronic == 0:
         return None
@@ -446,53 +519,41 @@ def calculate_acute_chronic_ratio(df):
     return acwr
 
 
-def analyze_brick_performance(df, activities_json):
+def analyze_brick_performance(df, activities):
     """
     Detect bike-to-run transitions and measure pace lag.
     
     "Brick" workouts are when cycling is immediately followed by running.
     """
-    brick_transitions = []
+    activity_type = df['activityType']
+    run_mask = type_mask(activity_type, 'running')
+    time_gap = (df['startTimeLocal'].shift(-1) - df['startTimeLocal']).dt.total_seconds() / 60
     
-    for i in range(len(df) - 1):
-        current = df.iloc[i]
-        next_activity = df.iloc[i + 1]
-        
-        time_gap = (next_activity['startTimeLocal'] - current['startTimeLocal']).total_seconds() / 60
-        
-        # If bike followed by run within 30 minutes, it's a brick
-        if ('cycling' in current['activityType'] or 'bike' in current['activityType']) and \
-           'running' in next_activity['activityType'] and \
-           time_gap < 30:
-            
-            run_pace = next_activity['paceMinPerKm']
-            avg_run_pace = df[df['activityType'].str.contains('running', na=False)]['paceMinPerKm'].median()
-            
-            if not pd.isna(run_pace) and not pd.isna(avg_run_pace):
-                pace_lag = ((run_pace - avg_run_pace) / avg_run_pace) * 100
-                brick_transitions.append(pace_lag)
+    # If bike followed by run within 30 minutes, it's a brick
+    is_brick = (type_mask(activity_type, 'cycling|bike') &
+                run_mask.shift(-1, fill_value=False) &
+                (time_gap < 30))
     
-    if brick_transitions:
-        return f"{np.mean(brick_transitions):.1f}% slower"
+    avg_run_pace = df.loc[run_mask, 'paceMinPerKm'].median()
+    run_pace = df['paceMinPerKm'].shift(-1)[is_brick]
+    brick_transitions = (((run_pace - avg_run_pace) / avg_run_pace) * 100).dropna()
+    
+    if not brick_transitions.empty:
+        return f"{brick_transitions.mean():.1f}% slower"
     return "No brick workouts detected"
 
 
-def calculate_run_decoupling(activities_json):
+def calculate_run_decoupling(activities):
     """Calculate decoupling specifically for running activities"""
-    run_decouplings = []
-    
-    for activity in activities_json:
-        if activity.get('activityType', {}).get('typeKey') == 'running':
-            decoupling = calculate_aerobic_decoupling(activity)
-            if decoupling is not None:
-                run_decouplings.append(decoupling)
+    run_decouplings = calculate_aerobic_decoupling(activities[activities['typeKey'] == 'running'])
+    run_decouplings = run_decouplings[~np.isnan(run_decouplings)]
     
-    if run_decouplings:
-        return f"{np.mean(run_decouplings):.1f}%"
+    if run_decouplings.size:
+        return f"{run_decouplings.mean():.1f}%"
     return "N/A"
 
 
-def recommend_trainerroad_workout(df, activities_json, acwr, hr_zones, run_decoupling):
+def recommend_trainerroad_workout(df, activities, acwr, hr_zones, run_decoupling):
     """
     Provide specific TrainerRoad workout recommendations based on current training state.
     
@@ -516,11 +577,9 @@ def recommend_trainerroad_workout(df, activities_json, acwr, hr_zones, run_decou
         "specific_workouts": []
     }
     
-    # Parse HR zone percentages - handle N/A values
-    z1_z2_str = hr_zones.get('Z1_2', '0%')
-    z4_z5_str = hr_zones.get('Z4_5', '0%')
-    z1_z2_pct = 0.0 if z1_z2_str == 'N/A' else float(z1_z2_str.replace('%', ''))
-    z4_z5_pct = 0.0 if z4_z5_str == 'N/A' else float(z4_z5_str.replace('%', ''))
+    # HR zone percentages - treat missing zone data as 0
+    z1_z2_pct = hr_zones['Z1_2'] or 0.0
+    z4_z5_pct = hr_zones['Z4_5'] or 0.0
     
     # High injury risk - recovery needed
     if acwr and acwr > 1.5:
@@ -588,6 +647,40 @@ def recommend_trainerroad_workout(df, activities_json, acwr, hr_zones, run_decou
     return recommendations
 
 
+def brief_fingerprint():
+    """Hash of everything the brief depends on: input file stats, settings and today's date"""
+    state = [datetime.now().strftime('%Y-%m-%d')]
+    for path in BRIEF_INPUTS:
+        try:
+            stat = os.stat(path)
+            state.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            state.append((str(path), None))
+    state.extend(os.getenv(key) for key in BRIEF_SETTINGS)
+    return hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+
+
+def load_cached_brief(fingerprint):
+    """Return the cached brief if it was generated from the same inputs, else None"""
+    try:
+        with open(BRIEF_CACHE, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get('fingerprint') == fingerprint else None
+
+
+def save_cached_brief(fingerprint, coaching_data, output):
+    """Write the brief cache atomically (temp file + rename)"""
+    tmp_path = BRIEF_CACHE.with_suffix('.tmp')
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'coaching_data': coaching_data, 'output': output}, f)
+        os.replace(tmp_path, BRIEF_CACHE)
+    except OSError as e:
+        print(f"Warning: Could not cache coaching brief: {e}")
+
+
 def generate_coaching_brief():
     """
     Generate a comprehensive "Coach's Brief" with all metrics.
@@ -595,7 +688,29 @@ def generate_coaching_brief():
     Output formats:
     - JSON for AI coaches
     - Markdown for human-readable summary
+    
+    When no input file, setting or the date changed since the last run,
+    the previous brief is replayed instead of recomputed.
     """
+    fingerprint = brief_fingerprint()
+    cached = load_cached_brief(fingerprint)
+    if cached is not None:
+        with open(COACHING_BRIEF_JSON, 'w') as f:
+            json.dump(cached['coaching_data'], f, indent=2)
+        sys.stdout.write(cached['output'])
+        return
+    
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            coaching_data = build_coaching_brief()
+    finally:
+        sys.stdout.write(output.getvalue())
+    save_cached_brief(fingerprint, coaching_data, output.getvalue())
+
+
+def build_coaching_brief():
+    """Compute all metrics, print the brief and save it as JSON; returns the coaching data"""
     print("=" * 70)
     print("🏆 ELITE COACHING BRIEF - Comprehensive Training Analysis")
     print("=" * 70)
@@ -614,38 +729,33 @@ def generate_coaching_brief():
     today = datetime.now()
     cutoff_date = today - timedelta(days=analysis_days)
     
-    # Filter activities JSON
-    activities_filtered = []
-    for activity in activities_json:
-        activity_date_str = activity.get('startTimeLocal', '')
-        if activity_date_str:
-            try:
-                activity_date = datetime.fromisoformat(activity_date_str.replace('Z', '+00:00'))
-                if activity_date.replace(tzinfo=None) >= cutoff_date:
-                    activities_filtered.append(activity)
-            except:
-                # Include activities with parsing errors to avoid losing data
-                activities_filtered.append(activity)
-    
-    print(f"Analyzing {len(activities_filtered)} activities from last {analysis_days} days ({len(activities_json)} total)")
+    # Convert activities JSON to a table once, then filter it
+    activities = activities_to_frame(activities_json)
+    # ISO-8601 date prefixes sort like the dates themselves, so compare strings by day
+    cutoff_day = cutoff_date.strftime('%Y-%m-%d')
+    start_days = activities['startTimeLocal'].str[:10]
+    is_date = start_days.str.fullmatch(r'\d{4}-\d{2}-\d{2}', na=False)
+    # Include activities with unparseable dates to avoid losing data
+    keep = (is_date & (start_days >= cutoff_day)) | (~is_date & (start_days != ''))
+    activities_filtered = activities[keep]
+    
+    print(f"Analyzing {len(activities_filtered)} activities from last {analysis_days} days ({len(activities)} total)")
     print(f"To change analysis period, set ANALYSIS_DAYS in .env (options: 7, 30, 60, 90)")
     
     # Calculate all metrics using filtered data for performance
     readiness = calculate_readiness_metrics(df, sleep_data, wellness_data)  # Uses 7-day window internally
-    acwr = calculate_acute_chronic_ratio(df)  # Uses 7d/28d windows
+    acute_load, chronic_load = calculate_training_loads(df)
+    acwr = calculate_acute_chronic_ratio(df, (acute_load, chronic_load))  # Uses 7d/28d windows
     hr_zones = analyze_hr_zones(df, activities_filtered)
+    hr_zone_labels = format_hr_zones(hr_zones)
     run_decoupling = calculate_run_decoupling(activities_filtered)
     swim_swolf = calculate_swim_swolf(activities_filtered)
     bike_ef = calculate_bike_efficiency_factor(df, activities_filtered)
-    brick_perf = analyze_brick_performance(df, activities_json)  # Keep all for brick analysis
-    ftp_data = calculate_ftp_from_activities(activities_json)  # Keep all for best FTP
-    
-    # Calculate TSS by sport
-    acute_load = df.tail(7)['duration'].sum() / 60
-    chronic_load = df.tail(28)['duration'].sum() / 60 if len(df) >= 28 else acute_load
+    brick_perf = analyze_brick_performance(df, activities)  # Keep all for brick analysis
+    ftp_data = calculate_ftp_from_activities(activities)  # Keep all for best FTP
     
     # Get TrainerRoad workout recommendations
-    tr_recommendations = recommend_trainerroad_workout(df, activities_json, acwr, hr_zones, run_decoupling)
+    tr_recommendations = recommend_trainerroad_workout(df, activities, acwr, hr_zones, run_decoupling)
     
     # Get periodization info
     race_info = periodization.get_race_info()
@@ -687,7 +797,7 @@ def generate_coaching_brief():
             "acwr": f"{acwr:.2f}" if acwr else "N/A",
             "injury_risk": "HIGH - Reduce volume!" if acwr and acwr > 1.5 else 
                           "Elevated" if acwr and acwr > 1.3 else "Optimal",
-            "distribution": hr_zones
+            "distribution": hr_zone_labels
         },
         "performance": {
             "run_decoupling": run_decoupling,
@@ -738,9 +848,8 @@ def generate_coaching_brief():
         else:
             notes.append("✅ Strong aerobic base - ready for intensity")
     
-    # Parse HR zone percentage - handle N/A values
-    z1_z2_str = hr_zones.get('Z1_2', '0%')
-    z1_z2 = 0.0 if z1_z2_str == 'N/A' else float(z1_z2_str.replace('%', ''))
+    # HR zone percentage - treat missing zone data as 0
+    z1_z2 = hr_zones['Z1_2'] or 0.0
     if z1_z2 > 0 and z1_z2 < 70:
         notes.append("📊 Only {:.0f}% time in Z1-Z2 - aim for 80/20 split".format(z1_z2))
     
@@ -797,9 +906,9 @@ def generate_coaching_brief():
     
     print()
     print(f"   Time in Zones ({analysis_days}-day analysis):")
-    print(f"      Zone 1-2 (Easy):  {hr_zones['Z1_2']}")
-    print(f"      Zone 3 (Tempo):   {hr_zones['Z3']}")
-    print(f"      Zone 4-5 (Hard):  {hr_zones['Z4_5']}")
+    print(f"      Zone 1-2 (Easy):  {hr_zone_labels['Z1_2']}")
+    print(f"      Zone 3 (Tempo):   {hr_zone_labels['Z3']}")
+    print(f"      Zone 4-5 (Hard):  {hr_zone_labels['Z4_5']}")
     print(f"   Target: 80% in Z1-2, 20% in Z3-5")
     print()
     
@@ -898,16 +1007,17 @@ def generate_coaching_brief():
     coaching_data['ai_coach_prompt'] = ai_prompt
     
     # Save JSON output
-    json_output_path = Path("./data/coaching_brief.json")
-    with open(json_output_path, 'w') as f:
+    with open(COACHING_BRIEF_JSON, 'w') as f:
         json.dump(coaching_data, f, indent=2)
     
-    print(f"💾 Saved JSON coaching brief to: {json_output_path}")
+    print(f"💾 Saved JSON coaching brief to: {COACHING_BRIEF_JSON}")
     print()
     print("📋 COPY FOR AI COACH:")
     print("-" * 70)
     print(json.dumps(coaching_data, indent=2))
     print()
+    
+    return coaching_data
 
 
 def main():
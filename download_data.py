@@ -5,13 +5,25 @@ Downloads activity data from Garmin Connect and saves it locally.
 """
 
 import os
+import sys
 import json
+import hashlib
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
-from garminconnect import Garmin, GarminConnectAuthenticationError
-import pandas as pd
-import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
 
 # Load environment variables
 load_dotenv()
@@ -21,14 +33,119 @@ GARMIN_EMAIL = os.getenv('GARMIN_EMAIL')
 GARMIN_PASSWORD = os.getenv('GARMIN_PASSWORD')
 DATA_DIR = Path(os.getenv('DATA_DIR', './data'))
 MAX_ACTIVITIES = int(os.getenv('MAX_ACTIVITIES', 100))
+# Saved Garmin OAuth tokens, reused to skip the full SSO login; one store per
+# account so switching GARMIN_EMAIL never logs in with the previous account's tokens
+GARMIN_TOKEN_STORE = str(
+    Path(os.getenv('GARMINTOKENS', '~/.garminconnect')).expanduser()
+    / hashlib.sha1((GARMIN_EMAIL or '').strip().lower().encode()).hexdigest()
+)
+# Concurrent Garmin API requests for per-day downloads (network-bound)
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', 8))
+# Activity fields exported to activities.csv (the summary uses a subset)
+ACTIVITY_COLUMNS = [
+    'activityId', 'activityName', 'activityType', 'startTimeLocal',
+    'distance', 'duration', 'averageSpeed', 'averageHR', 'maxHR',
+    'calories', 'elevationGain', 'averageRunningCadenceInStepsPerMinute'
+]
+# Fields kept in activities.json: the CSV columns plus what coaching_brief reads
+JSON_ACTIVITY_FIELDS = frozenset(
+    ACTIVITY_COLUMNS
+    + ['avgStrokes', 'max20MinPower', 'avgPower', 'normPower']
+    + [f'hrTimeInZone_{zone}' for zone in range(1, 6)]
+)
+# On-disk cache of Garmin API responses, reused for CACHE_TTL_HOURS
+CACHE_DIR = DATA_DIR / '.cache'
+CACHE_TTL = float(os.getenv('CACHE_TTL_HOURS', 6)) * 3600
+
+
+def cache_path(key):
+    """Cache file for a key like ('sleep', '2024-01-31')."""
+    return CACHE_DIR / f"{hashlib.sha1(repr(key).encode()).hexdigest()}.json"
+
+
+def cache_get(key, ttl=CACHE_TTL, final_after=None):
+    """
+    Return the cached response for key, or None if missing or older than ttl seconds (None = never expires).
+    
+    An entry written at or after the final_after timestamp holds data that can no
+    longer change, so it is kept regardless of age.
+    """
+    path = cache_path(key)
+    try:
+        written = path.stat().st_mtime
+        is_final = final_after is not None and written >= final_after
+        if ttl is not None and not is_final and time.time() - written > ttl:
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_put(key, value):
+    """Store a response in the cache (temp file + rename, safe across download threads)."""
+    path = cache_path(key)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.{time.monotonic_ns()}.tmp')
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f, default=str)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"  Warning: Could not cache {key[0]} response: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def configure_connection_pool(client):
+    """
+    Size the client's HTTPS connection pool for DOWNLOAD_WORKERS concurrent requests.
+    
+    requests keeps connections alive already, but garth's default pool holds 10
+    per host; with more threads the extra connections would be dropped and
+    re-opened (new TLS handshake) after every call. Garth's retry policy is kept.
+    Newer garminconnect releases without garth size their own pool (20).
+    """
+    session = getattr(getattr(client, 'garth', None), 'sess', None)
+    if session is None:
+        return
+    from requests.adapters import HTTPAdapter
+    
+    current = session.get_adapter('https://')
+    pool_size = max(DOWNLOAD_WORKERS, 10)
+    session.mount('https://', HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=getattr(current, 'max_retries', 0)
+    ))
+
+
+def save_garmin_tokens(client):
+    """Write the client's OAuth tokens to GARMIN_TOKEN_STORE for the next run."""
+    token_client = getattr(client, 'garth', None) or getattr(client, 'client', None)
+    if token_client is None:
+        return
+    try:
+        token_client.dump(GARMIN_TOKEN_STORE)
+    except Exception as e:
+        print(f"  Warning: Could not save Garmin login tokens: {e}")
 
 
 def authenticate_garmin():
-    """Authenticate with Garmin Connect."""
+    """Authenticate with Garmin Connect, reusing saved tokens when possible."""
+    from garminconnect import Garmin, GarminConnectAuthenticationError
+    
     try:
         print("Authenticating with Garmin Connect...")
         client = Garmin(GARMIN_EMAIL, GARMIN_PASSWORD)
-        client.login()
+        try:
+            client.login(GARMIN_TOKEN_STORE)
+        except Exception:
+            # No usable saved tokens (missing, stale or revoked): full credential
+            # login on a fresh client, then save the new tokens
+            client = Garmin(GARMIN_EMAIL, GARMIN_PASSWORD)
+            client.login()
+            save_garmin_tokens(client)
+        configure_connection_pool(client)
         print("✓ Authentication successful")
         return client
     except GarminConnectAuthenticationError as e:
@@ -43,7 +160,7 @@ def download_activities(client, limit=MAX_ACTIVITIES):
     """Download recent activities from Garmin Connect."""
     try:
         print(f"\nDownloading last {limit} activities...")
-        activities = client.get_activities(0, limit)
+        activities = fetch_cached(('activities', limit), client.get_activities, 0, limit)
         print(f"✓ Downloaded {len(activities)} activities")
         return activities
     except Exception as e:
@@ -61,6 +178,31 @@ def download_activity_details(client, activity_id):
         return None
 
 
+def download_activities_details(client, activity_ids):
+    """Download detailed data for several activities concurrently, in the order given."""
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        return list(executor.map(lambda activity_id: download_activity_details(client, activity_id),
+                                 activity_ids))
+
+
+def fetch_cached(key, fetch, *args, ttl=CACHE_TTL, final_after=None):
+    """Call a Garmin API method, serving the response from the disk cache while it is fresh."""
+    result = cache_get(key, ttl, final_after)
+    if result is None:
+        result = fetch(*args)
+        if result:
+            cache_put(key, result)
+    return result
+
+
+def try_fetch(fetch, *args, **kwargs):
+    """Call fetch, returning (result, None) or (None, exception)."""
+    try:
+        return fetch(*args, **kwargs), None
+    except Exception as e:
+        return None, e
+
+
 def download_sleep_data(client, days=30):
     """Download sleep data for the last N days."""
     sleep_data = []
@@ -68,20 +210,34 @@ def download_sleep_data(client, days=30):
     
     try:
         today = datetime.now().date()
-        for i in range(days):
-            date = today - timedelta(days=i)
-            date_str = date.strftime('%Y-%m-%d')
-            
-            try:
-                sleep_info = client.get_sleep_data(date_str)
+        date_strs = [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
+        
+        def fetch_sleep(i):
+            # A night's sleep is final two days later; entries fetched from then on never
+            # expire, while earlier fetches (possibly before the watch synced) keep the TTL
+            final_after = datetime.combine(today - timedelta(days=i - 2), datetime.min.time()).timestamp()
+            return try_fetch(fetch_cached, ('sleep', date_strs[i]), client.get_sleep_data, date_strs[i],
+                             final_after=final_after)
+        
+        # Progress bar on a terminal when tqdm is installed (disable=None turns it off
+        # for non-TTY output such as the GUI); messages go through tqdm.write so
+        # they don't break the bar
+        report = print if tqdm is None else tqdm.write
+        
+        # One request per day; run them concurrently, results come back in date order
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            results = executor.map(fetch_sleep, range(days))
+            if tqdm is not None:
+                results = tqdm(results, total=days, desc="  Sleep", unit="day", leave=False, disable=None)
+            for i, (date_str, (sleep_info, error)) in enumerate(zip(date_strs, results)):
+                if error is not None:
+                    if i < 3:
+                        report(f"  - {date_str}: No data ({str(error)[:50]})")
+                    continue
                 if sleep_info:
                     sleep_data.append(sleep_info)
                     if i < 3:  # Show first 3 days
-                        print(f"  ✓ {date_str}: Found sleep data")
-            except Exception as e:
-                if i < 3:
-                    print(f"  - {date_str}: No data ({str(e)[:50]})")
-                continue
+                        report(f"  ✓ {date_str}: Found sleep data")
         
         print(f"✓ Downloaded sleep data for {len(sleep_data)} days")
         return sleep_data
@@ -102,48 +258,55 @@ def download_wellness_data(client, days=30):
     print(f"\nDownloading wellness data for last {days} days...")
     
     try:
-        today = datetime.now().date()
+        today_iso = datetime.now().date().isoformat()
+        
+        # The four endpoints are independent, so request them concurrently
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            hr_future = executor.submit(try_fetch, fetch_cached, ('heart_rates', today_iso),
+                                        client.get_heart_rates, today_iso)
+            hrv_future = executor.submit(try_fetch, fetch_cached, ('hrv', today_iso),
+                                         client.get_hrv_data, today_iso)
+            stress_future = executor.submit(try_fetch, fetch_cached, ('stress', today_iso),
+                                            client.get_stress_data, today_iso)
+            bb_future = executor.submit(try_fetch, fetch_cached, ('body_battery', today_iso),
+                                        client.get_body_battery, today_iso)
         
         # Get heart rates (includes resting HR!)
-        try:
-            print("  Fetching daily heart rates...")
-            hr_data = client.get_heart_rates(today.isoformat())
-            if hr_data:
-                wellness_data['heart_rates'] = hr_data
-                if 'restingHeartRate' in hr_data:
-                    print(f"    ✓ Resting HR: {hr_data.get('restingHeartRate')} bpm")
-        except Exception as e:
-            print(f"    - Heart rates: {str(e)[:60]}")
+        print("  Fetching daily heart rates...")
+        hr_data, error = hr_future.result()
+        if error is not None:
+            print(f"    - Heart rates: {str(error)[:60]}")
+        elif hr_data:
+            wellness_data['heart_rates'] = hr_data
+            if 'restingHeartRate' in hr_data:
+                print(f"    ✓ Resting HR: {hr_data.get('restingHeartRate')} bpm")
         
         # Get HRV data
-        try:
-            print("  Fetching HRV data...")
-            hrv_data = client.get_hrv_data(today.isoformat())
-            if hrv_data:
-                wellness_data['hrv'] = hrv_data
-                print(f"    ✓ HRV data retrieved")
-        except Exception as e:
-            print(f"    - HRV: {str(e)[:60]}")
+        print("  Fetching HRV data...")
+        hrv_data, error = hrv_future.result()
+        if error is not None:
+            print(f"    - HRV: {str(error)[:60]}")
+        elif hrv_data:
+            wellness_data['hrv'] = hrv_data
+            print(f"    ✓ HRV data retrieved")
         
         # Get stress data
-        try:
-            print("  Fetching stress data...")
-            stress_data = client.get_stress_data(today.isoformat())
-            if stress_data:
-                wellness_data['stress'] = stress_data
-                print(f"    ✓ Stress data retrieved")
-        except Exception as e:
-            print(f"    - Stress: {str(e)[:60]}")
+        print("  Fetching stress data...")
+        stress_data, error = stress_future.result()
+        if error is not None:
+            print(f"    - Stress: {str(error)[:60]}")
+        elif stress_data:
+            wellness_data['stress'] = stress_data
+            print(f"    ✓ Stress data retrieved")
         
         # Get body battery
-        try:
-            print("  Fetching body battery...")
-            bb_data = client.get_body_battery(today.isoformat())
-            if bb_data:
-                wellness_data['body_battery'] = bb_data
-                print(f"    ✓ Body battery retrieved")
-        except Exception as e:
-            print(f"    - Body battery: {str(e)[:60]}")
+        print("  Fetching body battery...")
+        bb_data, error = bb_future.result()
+        if error is not None:
+            print(f"    - Body battery: {str(error)[:60]}")
+        elif bb_data:
+            wellness_data['body_battery'] = bb_data
+            print(f"    ✓ Body battery retrieved")
         
         print(f"✓ Wellness data download complete")
         return wellness_data
@@ -158,12 +321,13 @@ def download_training_stats(client):
     stats_data = {}
     
     print(f"\nDownloading training statistics...")
+    today_iso = datetime.now().date().isoformat()
     
     try:
         # Get training status
         try:
             print("  Fetching training status...")
-            training_status = client.get_training_status()
+            training_status = fetch_cached(('training_status', today_iso), client.get_training_status)
             if training_status:
                 stats_data['training_status'] = training_status
                 print(f"    ✓ Training status retrieved")
@@ -173,7 +337,7 @@ def download_training_stats(client):
         # Get stats (VO2 max, FTP, etc.)
         try:
             print("  Fetching athlete stats...")
-            stats = client.get_stats(datetime.now().isoformat()[:10])
+            stats = fetch_cached(('stats', today_iso), client.get_stats, today_iso)
             if stats:
                 stats_data['stats'] = stats
                 print(f"    ✓ Stats retrieved")
@@ -183,15 +347,17 @@ def download_training_stats(client):
         # Get max metrics (VO2 max, FTP, lactate threshold)
         try:
             print("  Fetching max metrics (VO2, FTP, thresholds)...")
-            max_metrics = client.get_max_metrics(datetime.now().isoformat()[:10])
+            max_metrics = fetch_cached(('max_metrics', today_iso), client.get_max_metrics, today_iso)
             if max_metrics:
                 stats_data['max_metrics'] = max_metrics
                 # Display FTP if available
                 if isinstance(max_metrics, dict):
                     for metric in max_metrics.get('metrics', []):
-                        if 'cycling' in str(metric).lower() and 'ftp' in str(metric).lower():
+                        # Metric layout varies, so search its text once
+                        metric_text = str(metric).lower()
+                        if 'cycling' in metric_text and 'ftp' in metric_text:
                             print(f"    ✓ Cycling FTP found")
-                        elif 'vo2' in str(metric).lower():
+                        elif 'vo2' in metric_text:
                             print(f"    ✓ VO2 max data found")
                 print(f"    ✓ Max metrics retrieved")
         except Exception as e:
@@ -205,40 +371,68 @@ def download_training_stats(client):
         return stats_data
 
 
-def save_activities_json(activities, filename='activities.json'):
-    """Save activities to JSON file."""
+def activity_type_keys(activities):
+    """Extract the activityType typeKey of each activity ('unknown' if missing)."""
+    type_keys = []
+    for activity in activities:
+        activity_type = activity.get('activityType', {})
+        if isinstance(activity_type, dict):
+            type_keys.append(activity_type.get('typeKey', 'unknown'))
+        else:
+            type_keys.append(str(activity_type))
+    return type_keys
+
+
+def write_json(data, filepath):
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        Path(filepath).write_bytes(orjson.dumps(data, default=str,
+                                                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+
+
+def save_activities_json(activities, filename='activities.json', full=False):
+    """Save activities to JSON file (only JSON_ACTIVITY_FIELDS unless full=True)."""
+    if not full:
+        activities = [
+            {key: value for key, value in activity.items() if key in JSON_ACTIVITY_FIELDS}
+            for activity in activities
+        ]
     filepath = DATA_DIR / filename
-    with open(filepath, 'w') as f:
-        json.dump(activities, f, indent=2, default=str)
+    write_json(activities, filepath)
     print(f"✓ Saved raw data to {filepath}")
 
 
-def save_activities_csv(activities, filename='activities.csv'):
-    """Save activities to CSV file for easy analysis."""
-    # Convert to DataFrame
-    df = pd.DataFrame(activities)
+def build_activities_df(activities):
+    """Convert downloaded activities to a DataFrame shared by the CSV export and summary."""
+    import pandas as pd
+    
+    # Build only the exported columns, one list per field, instead of letting
+    # pandas unpack every nested field of every activity dict
+    present = {key for activity in activities for key in activity}
+    df = pd.DataFrame({
+        column: pd.Categorical(activity_type_keys(activities)) if column == 'activityType'
+        else [activity.get(column) for activity in activities]
+        for column in ACTIVITY_COLUMNS if column in present
+    })
     
-    # Extract activity type name from dictionary
-    if 'activityType' in df.columns:
-        df['activityType'] = df['activityType'].apply(
-            lambda x: x.get('typeKey', 'unknown') if isinstance(x, dict) else str(x)
-        )
+    # Convert date strings to datetime
+    if 'startTimeLocal' in df.columns:
+        df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'], format='ISO8601', cache=True)
     
-    # Select and rename key columns
-    columns_to_keep = [
-        'activityId', 'activityName', 'activityType', 'startTimeLocal',
-        'distance', 'duration', 'averageSpeed', 'averageHR', 'maxHR',
-        'calories', 'elevationGain', 'averageRunningCadenceInStepsPerMinute'
-    ]
+    return df
+
+
+def save_activities_csv(df, filename='activities.csv'):
+    """Save activities (from build_activities_df) to CSV file for easy analysis."""
+    import numpy as np
     
     # Filter columns that exist
-    available_columns = [col for col in columns_to_keep if col in df.columns]
+    available_columns = [col for col in ACTIVITY_COLUMNS if col in df.columns]
     df_filtered = df[available_columns].copy()
     
-    # Convert date strings to datetime
-    if 'startTimeLocal' in df_filtered.columns:
-        df_filtered['startTimeLocal'] = pd.to_datetime(df_filtered['startTimeLocal'])
-    
     # Convert distance from meters to kilometers
     if 'distance' in df_filtered.columns:
         df_filtered['distanceKm'] = df_filtered['distance'] / 1000
@@ -256,15 +450,14 @@ def save_activities_csv(activities, filename='activities.csv'):
     if 'averageSpeed' in df_filtered.columns and 'activityType' in df_filtered.columns:
         # For cycling activities: max realistic speed is 45 mph = 20.1 m/s
         cycling_types = ['cycling', 'road_biking', 'indoor_cycling', 'mountain_biking']
-        cycling_mask = df_filtered['activityType'].isin(cycling_types)
-        df_filtered.loc[cycling_mask & (df_filtered['averageSpeed'] > 20.1), 'averageSpeed'] = np.nan
-        df_filtered.loc[cycling_mask & (df_filtered['averageSpeed'] > 20.1), 'paceMinPerKm'] = np.nan
+        bad_cycling = df_filtered['activityType'].isin(cycling_types) & (df_filtered['averageSpeed'] > 20.1)
         
         # For running activities: min realistic pace is 6:30 min/mile = 4:02 min/km
         running_types = ['running', 'treadmill_running', 'trail_running', 'track_running']
-        running_mask = df_filtered['activityType'].isin(running_types)
-        df_filtered.loc[running_mask & (df_filtered['paceMinPerKm'] < 4.03), 'averageSpeed'] = np.nan
-        df_filtered.loc[running_mask & (df_filtered['paceMinPerKm'] < 4.03), 'paceMinPerKm'] = np.nan
+        bad_running = df_filtered['activityType'].isin(running_types) & (df_filtered['paceMinPerKm'] < 4.03)
+        
+        # Both masks are taken before blanking, then speed and pace are cleared together
+        df_filtered.loc[bad_cycling | bad_running, ['averageSpeed', 'paceMinPerKm']] = np.nan
     
     # Save to CSV
     filepath = DATA_DIR / filename
@@ -274,50 +467,53 @@ def save_activities_csv(activities, filename='activities.csv'):
     return df_filtered
 
 
-def print_summary(activities):
-    """Print a summary of downloaded activities."""
-    if not activities:
+def print_summary(df):
+    """Print a summary of downloaded activities (from build_activities_df)."""
+    if df.empty:
         return
     
-    print("\n" + "="*60)
-    print("ACTIVITY SUMMARY")
-    print("="*60)
+    lines = []
+    out = lines.append
     
-    df = pd.DataFrame(activities)
-    
-    # Extract activity type name from dictionary
-    if 'activityType' in df.columns:
-        df['activityType'] = df['activityType'].apply(
-            lambda x: x.get('typeKey', 'unknown') if isinstance(x, dict) else str(x)
-        )
+    out("\n" + "="*60)
+    out("ACTIVITY SUMMARY")
+    out("="*60)
     
     # Activity types
     if 'activityType' in df.columns:
-        print("\nActivity Types:")
-        type_counts = df['activityType'].value_counts()
+        out("\nActivity Types:")
+        # activityType is categorical, so this counts integer codes
+        type_counts = (df.groupby('activityType', observed=True, sort=False).size()
+                       .sort_values(ascending=False, kind='stable'))
         for activity_type, count in type_counts.items():
-            print(f"  {activity_type}: {count}")
+            out(f"  {activity_type}: {count}")
     
     # Total distance
     if 'distance' in df.columns:
         total_km = df['distance'].sum() / 1000
-        print(f"\nTotal Distance: {total_km:.2f} km")
+        out(f"\nTotal Distance: {total_km:.2f} km")
     
     # Total time
     if 'duration' in df.columns:
         total_hours = df['duration'].sum() / 3600
-        print(f"Total Time: {total_hours:.2f} hours")
+        out(f"Total Time: {total_hours:.2f} hours")
     
     # Date range
     if 'startTimeLocal' in df.columns:
-        dates = pd.to_datetime(df['startTimeLocal'])
-        print(f"\nDate Range: {dates.min()} to {dates.max()}")
+        out(f"\nDate Range: {df['startTimeLocal'].min()} to {df['startTimeLocal'].max()}")
+    
+    out("="*60)
     
-    print("="*60)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def main():
-    """Main execution function."""
+def main(refresh=False, full=False):
+    """
+    Main execution function.
+    
+    refresh=True ignores cached API responses; full=True saves every activity
+    field Garmin returns to activities.json.
+    """
     print("=" * 60)
     print("GARMIN DATA DOWNLOADER")
     print("=" * 60)
@@ -334,6 +530,10 @@ def main():
     DATA_DIR.mkdir(exist_ok=True)
     print(f"Data directory: {DATA_DIR.absolute()}")
     
+    if refresh:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print("Cleared cached Garmin responses")
+    
     # Authenticate
     client = authenticate_garmin()
     if not client:
@@ -355,32 +555,27 @@ def main():
     training_stats = download_training_stats(client)
     
     # Save data
-    save_activities_json(activities)
-    save_activities_csv(activities)
+    save_activities_json(activities, full=full)
+    df = build_activities_df(activities)
+    save_activities_csv(df)
     
-    # Save sleep data
+    # Save sleep data, wellness data and training stats
+    outputs = []
     if sleep_data:
-        sleep_file = DATA_DIR / 'sleep.json'
-        with open(sleep_file, 'w') as f:
-            json.dump(sleep_data, f, indent=2, default=str)
-        print(f"✓ Saved sleep data to {sleep_file}")
-    
-    # Save wellness data
+        outputs.append(('sleep data', DATA_DIR / 'sleep.json', sleep_data))
     if wellness_data and any(wellness_data.values()):
-        wellness_file = DATA_DIR / 'wellness.json'
-        with open(wellness_file, 'w') as f:
-            json.dump(wellness_data, f, indent=2, default=str)
-        print(f"✓ Saved wellness data to {wellness_file}")
-    
-    # Save training stats
+        outputs.append(('wellness data', DATA_DIR / 'wellness.json', wellness_data))
     if training_stats:
-        stats_file = DATA_DIR / 'training_stats.json'
-        with open(stats_file, 'w') as f:
-            json.dump(training_stats, f, indent=2, default=str)
-        print(f"✓ Saved training stats to {stats_file}")
+        outputs.append(('training stats', DATA_DIR / 'training_stats.json', training_stats))
+    
+    # The files are independent, so serialize and write them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda output: write_json(output[2], output[1]), outputs))
+    for label, filepath, _ in outputs:
+        print(f"✓ Saved {label} to {filepath}")
     
     # Print summary
-    print_summary(activities)
+    print_summary(df)
     
     print("\n✓ Download complete!")
     print(f"\nNext steps:")
@@ -389,4 +584,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(refresh='--refresh' in sys.argv[1:], full='--full' in sys.argv[1:])
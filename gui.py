@@ -2,26 +2,139 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
+import subprocess
+import codecs
+import io
+import contextlib
+import atexit
+import shutil
+import tempfile
 import sys
 import os
+import re
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PIL import Image, ImageTk
 from datetime import datetime
-import download_data
-import analyze_data
-import triathlon_analysis
-import visualize_data
-import coaching_brief
+
+IMAGE_CACHE_SIZE = 32  # Resized gallery images kept in memory
+FULLSCREEN_CACHE_SIZE = 4  # Screen-sized images are large, so keep only a few
+THUMBNAIL_SIZE = (1024, 1024)  # Gallery pane thumbnails; larger canvases and fullscreen use the original
+MAX_OUTPUT_LINES = 5000  # Older lines are dropped from the output pane
+OUTPUT_FLUSH_MS = 50  # Redirected output is inserted at most this often
+SEPARATOR = "=" * 70  # Section rule in the output pane
+ENV_KEY_PATTERNS = {key: re.compile(rf"^{key}=.*$", re.MULTILINE) for key in (
+    'GARMIN_EMAIL', 'GARMIN_PASSWORD', 'RACE_DATE', 'RACE_TYPE', 'RACE_PRIORITY', 'ANALYSIS_DAYS')}
+
+def thumbnail_path(image_path):
+    return image_path.parent / '.thumbs' / f"{image_path.stem}.webp"
+
+def thumbnail_is_fresh(image_path):
+    thumb = thumbnail_path(image_path)
+    try:
+        return thumb.stat().st_mtime_ns >= image_path.stat().st_mtime_ns
+    except OSError:
+        return False
+
+def make_thumbnail(image_path):
+    """Write a WEBP thumbnail next to the visualizations if missing or stale"""
+    if thumbnail_is_fresh(image_path):
+        return
+    thumb = thumbnail_path(image_path)
+    thumb.parent.mkdir(exist_ok=True)
+    image = Image.open(image_path)
+    image.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    # Unique temp name so a rebuild never collides with another job's write
+    fd, tmp = tempfile.mkstemp(dir=thumb.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        image.save(tmp, 'WEBP', quality=85)
+        os.replace(tmp, thumb)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+def run_module(module, output=None):
+    """Run a pipeline script in a child process, streaming its output to sys.stdout"""
+    if output is None:
+        output = sys.stdout
+    script = Path(__file__).with_name(f"{module}.py")
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    process = subprocess.Popen([sys.executable, '-u', str(script)], stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, bufsize=0, env=env)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with process.stdout:
+        while chunk := os.read(process.stdout.fileno(), 65536):
+            output.write(decoder.decode(chunk))
+    output.write(decoder.decode(b'', final=True))
+    if process.wait() != 0:
+        raise RuntimeError(f"{module} exited with status {process.returncode}")
+
+def png_size(image_path):
+    """Read a PNG's width and height from its IHDR header, or None for other files"""
+    with open(image_path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+def fits_canvas(image_path, canvas_width, canvas_height):
+    """True if a PNG already fits the canvas margin and needs no downscaling"""
+    size = png_size(image_path)
+    return size is not None and size[0] <= int(canvas_width * 0.95) and size[1] <= int(canvas_height * 0.95)
+
+def resize_to_canvas(image_path, canvas_width, canvas_height):
+    """Open an image and scale it to fit the canvas with a small margin"""
+    size = (int(canvas_width * 0.95), int(canvas_height * 0.95))
+    # The thumbnail is only big enough when the target fits inside THUMBNAIL_SIZE;
+    # larger canvases scale the original PNG so charts stay full size and sharp
+    fits_thumbnail = size[0] <= THUMBNAIL_SIZE[0] and size[1] <= THUMBNAIL_SIZE[1]
+    use_thumbnail = fits_thumbnail and thumbnail_is_fresh(image_path)
+    image = Image.open(thumbnail_path(image_path) if use_thumbnail else image_path)
+    # reducing_gap box-reduces first so LANCZOS only runs near the target size
+    image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return image
 
 class OutputRedirector:
+    """
+    Buffers writes from any thread; the Tk thread drains them into the text
+    widget every OUTPUT_FLUSH_MS, so worker threads never touch Tk directly.
+    """
     def __init__(self, text_widget):
         self.text_widget = text_widget
+        self.buffer = []
+        self.lock = threading.Lock()
+        # Write-behind copy of everything shown, so saving doesn't copy the widget's text
+        self.log = tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.log', delete=False)
+        atexit.register(self.close)
+        self.pump()
     def write(self, string):
-        self.text_widget.insert(tk.END, string)
+        with self.lock:
+            self.buffer.append(string)
+    def pump(self):
+        self.flush_to_widget()
+        self.text_widget.after(OUTPUT_FLUSH_MS, self.pump)
+    def flush_to_widget(self):
+        with self.lock:
+            if not self.buffer:
+                return
+            text = ''.join(self.buffer)
+            self.buffer.clear()
+        self.text_widget.insert(tk.END, text)
+        self.log.write(text)
+        if int(self.text_widget.index('end-1c').split('.')[0]) > MAX_OUTPUT_LINES:
+            self.text_widget.delete('1.0', f'end - {MAX_OUTPUT_LINES} lines')
         self.text_widget.see(tk.END)
-        self.text_widget.update()
     def flush(self):
         pass
+    def clear_log(self):
+        self.log.seek(0)
+        self.log.truncate()
+    def close(self):
+        self.log.close()
+        os.unlink(self.log.name)
 
 class GarminAnalyzerGUI:
     def __init__(self, root):
@@ -32,7 +145,22 @@ class GarminAnalyzerGUI:
         self.current_image_index = 0
         self.image_files = []
         self.photo_image = None
+        self.image_item = None  # Canvas item showing the current gallery image
+        self.image_cache = OrderedDict()  # (path, mtime, canvas size) -> PhotoImage
+        self.fullscreen_cache = OrderedDict()  # (path, mtime, screen size) -> PhotoImage
+        self.prefetched_images = {}  # Same keys -> resized PIL image from the prefetch thread
+        self.prefetch_pool = ThreadPoolExecutor(max_workers=1)
+        # Pillow releases the GIL while decoding, resizing and encoding, so threads scale across cores
+        self.thumbnail_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self.thumbnails_in_flight = set()  # Image paths with a queued or running thumbnail job
         self.fullscreen_window = None
+        self.resize_after_id = None
+        self.viz_dir_mtime = None
+        self.garmin_session = None  # (email, password, client) from the last successful connection test
+        # Settings values, read from .env once and kept in sync by the Settings dialog
+        from dotenv import load_dotenv
+        load_dotenv()
+        self.env = dict(os.environ)
         self.setup_ui()
         self.output_redirector = OutputRedirector(self.output_text)
         self.load_visualizations()
@@ -91,6 +219,7 @@ class GarminAnalyzerGUI:
         canvas_frame.rowconfigure(0, weight=1)
         self.image_canvas = tk.Canvas(canvas_frame, bg='white')
         self.image_canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.image_canvas.bind('<Configure>', self.on_canvas_configure)
         self.image_info_var = tk.StringVar(value="No visualizations found")
         ttk.Label(right_frame, textvariable=self.image_info_var, font=("Arial", 10)).grid(row=2, column=0, pady=(0, 5))
         nav_frame = ttk.Frame(right_frame)
@@ -104,14 +233,38 @@ class GarminAnalyzerGUI:
         self.fullscreen_btn = ttk.Button(nav_frame, text="🔍 Fullscreen", command=self.show_fullscreen, width=12)
         self.fullscreen_btn.pack(side=tk.LEFT, padx=3)
     
+    def set_status(self, text):
+        # Skip the trace callbacks and redraw when the text is unchanged
+        if self.status_var.get() != text:
+            self.status_var.set(text)
+    
+    def set_image_info(self, text):
+        if self.image_info_var.get() != text:
+            self.image_info_var.set(text)
+    
     def load_visualizations(self):
         viz_dir = Path("./data/visualizations")
         if not viz_dir.exists():
             self.image_files = []
+            self.viz_dir_mtime = None
             self.current_image_index = 0
             self.display_no_images()
             return
-        self.image_files = sorted(list(viz_dir.glob("*.png")))
+        # Only rescan when files were added or removed; overwritten PNGs are
+        # picked up by the mtime in the image cache key
+        viz_dir_mtime = viz_dir.stat().st_mtime_ns
+        if viz_dir_mtime != self.viz_dir_mtime or not self.image_files:
+            with os.scandir(viz_dir) as entries:
+                pngs = [entry for entry in entries if entry.name.endswith(".png") and entry.is_file()]
+            pngs.sort(key=lambda entry: entry.name)
+            self.image_files = [Path(entry.path) for entry in pngs]
+            self.viz_dir_mtime = viz_dir_mtime
+        # Build missing thumbnails in the background; until then the full PNG is used
+        for image_path in self.image_files:
+            if image_path not in self.thumbnails_in_flight and not thumbnail_is_fresh(image_path):
+                self.thumbnails_in_flight.add(image_path)
+                future = self.thumbnail_pool.submit(make_thumbnail, image_path)
+                future.add_done_callback(lambda _, path=image_path: self.thumbnails_in_flight.discard(path))
         if not self.image_files:
             self.display_no_images()
         else:
@@ -120,7 +273,8 @@ class GarminAnalyzerGUI:
     
     def display_no_images(self):
         self.image_canvas.delete("all")
-        self.image_info_var.set("No visualizations found - Create some first!")
+        self.image_item = None
+        self.set_image_info("No visualizations found - Create some first!")
         self.prev_btn.config(state='disabled')
         self.next_btn.config(state='disabled')
     
@@ -130,27 +284,79 @@ class GarminAnalyzerGUI:
             return
         image_path = self.image_files[self.current_image_index]
         try:
-            image = Image.open(image_path)
             canvas_width = self.image_canvas.winfo_width()
             canvas_height = self.image_canvas.winfo_height()
             if canvas_width <= 1:
                 canvas_width = 600
             if canvas_height <= 1:
                 canvas_height = 500
-            img_width, img_height = image.size
-            scale = min(canvas_width / img_width, canvas_height / img_height)
-            new_width = int(img_width * scale * 0.95)
-            new_height = int(img_height * scale * 0.95)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            self.photo_image = ImageTk.PhotoImage(image)
-            self.image_canvas.delete("all")
-            self.image_canvas.create_image(canvas_width // 2, canvas_height // 2, image=self.photo_image, anchor=tk.CENTER)
-            self.image_info_var.set(f"📊 {image_path.name} ({self.current_image_index + 1}/{len(self.image_files)})")
+            # Reuse the resized image when revisiting it at the same canvas size
+            key = (str(image_path), image_path.stat().st_mtime_ns, canvas_width, canvas_height)
+            photo = self.image_cache.get(key)
+            if photo is not None:
+                self.image_cache.move_to_end(key)
+            else:
+                image = self.prefetched_images.pop(key, None)
+                evicted = None
+                if len(self.image_cache) >= IMAGE_CACHE_SIZE:
+                    _, evicted = self.image_cache.popitem(last=False)
+                if image is None and fits_canvas(image_path, canvas_width, canvas_height):
+                    # Already small enough: Tk decodes the PNG natively, no Pillow round trip
+                    photo = tk.PhotoImage(file=str(image_path))
+                else:
+                    if image is None:
+                        image = resize_to_canvas(image_path, canvas_width, canvas_height)
+                    # Recycle the evicted Tk image buffer when it already has the right size
+                    if (isinstance(evicted, ImageTk.PhotoImage) and evicted is not self.photo_image
+                            and (evicted.width(), evicted.height()) == image.size):
+                        evicted.paste(image)
+                        photo = evicted
+                    else:
+                        photo = ImageTk.PhotoImage(image)
+                self.image_cache[key] = photo
+            self.photo_image = photo
+            # Swap the image on the existing canvas item rather than recreating it
+            if self.image_item is None:
+                self.image_item = self.image_canvas.create_image(canvas_width // 2, canvas_height // 2, image=self.photo_image, anchor=tk.CENTER)
+            else:
+                self.image_canvas.itemconfig(self.image_item, image=self.photo_image)
+                self.image_canvas.coords(self.image_item, canvas_width // 2, canvas_height // 2)
+            self.set_image_info(f"📊 {image_path.name} ({self.current_image_index + 1}/{len(self.image_files)})")
             self.prev_btn.config(state='normal' if self.current_image_index > 0 else 'disabled')
             self.next_btn.config(state='normal' if self.current_image_index < len(self.image_files) - 1 else 'disabled')
+            # Decode the neighbours in the background so the next clicks are instant
+            for offset in (1, -1, 2, -2):
+                index = self.current_image_index + offset
+                if 0 <= index < len(self.image_files):
+                    self.prefetch_pool.submit(self.prefetch_image, self.image_files[index], canvas_width, canvas_height)
         except Exception as e:
             self.image_canvas.delete("all")
-            self.image_info_var.set(f"Error loading image: {str(e)}")
+            self.image_item = None
+            self.set_image_info(f"Error loading image: {str(e)}")
+    
+    def prefetch_image(self, image_path, canvas_width, canvas_height):
+        """Resize an image off the UI thread; PhotoImage creation stays on the main thread"""
+        try:
+            key = (str(image_path), image_path.stat().st_mtime_ns, canvas_width, canvas_height)
+            if key in self.image_cache or key in self.prefetched_images:
+                return
+            if fits_canvas(image_path, canvas_width, canvas_height):
+                return  # Loaded natively by Tk on the main thread
+            if len(self.prefetched_images) >= IMAGE_CACHE_SIZE:
+                self.prefetched_images.clear()
+            self.prefetched_images[key] = resize_to_canvas(image_path, canvas_width, canvas_height)
+        except Exception:
+            pass  # The main thread reports errors when the image is actually shown
+    
+    def on_canvas_configure(self, event):
+        """Redraw once resizing settles instead of on every drag event"""
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.root.after(150, self.redraw_after_resize)
+    
+    def redraw_after_resize(self):
+        self.resize_after_id = None
+        self.display_current_image()
     
     def prev_image(self):
         if self.current_image_index > 0:
@@ -173,52 +379,50 @@ class GarminAnalyzerGUI:
         def wrapper():
             self.is_running = True
             self.root.after(0, lambda: self.set_buttons_state('disabled'))
-            old_stdout = sys.stdout
             try:
-                sys.stdout = self.output_redirector
-                func(*args)
-                self.root.after(0, lambda: self.status_var.set("✓ Complete"))
+                with contextlib.redirect_stdout(self.output_redirector):
+                    func(*args)
+                self.root.after(0, lambda: self.set_status("✓ Complete"))
             except Exception as e:
                 error_msg = str(e)
-                self.root.after(0, lambda: self.output_text.insert(tk.END, f"\n\n✗ Error: {error_msg}\n"))
-                self.root.after(0, lambda: self.status_var.set("✗ Error occurred"))
+                self.output_redirector.write(f"\n\n✗ Error: {error_msg}\n")
+                self.root.after(0, lambda: self.set_status("✗ Error occurred"))
                 self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred:\n{error_msg}"))
             finally:
-                sys.stdout = old_stdout
                 self.is_running = False
                 self.root.after(0, lambda: self.set_buttons_state('normal'))
         threading.Thread(target=wrapper, daemon=True).start()
     
     def download_data(self):
-        self.output_text.insert(tk.END, "\n" + "="*70 + "\n")
-        self.status_var.set("⏳ Downloading data from Garmin Connect...")
-        self.run_in_thread(download_data.main)
+        self.output_redirector.write(f"\n{SEPARATOR}\n")
+        self.set_status("⏳ Downloading data from Garmin Connect...")
+        self.run_in_thread(run_module, 'download_data')
     
     def analyze_data(self):
         if not Path("./data/activities.csv").exists():
             messagebox.showwarning("No Data", "No data found. Please download data first.")
             return
-        self.output_text.insert(tk.END, "\n" + "="*70 + "\n")
-        self.status_var.set("⏳ Analyzing data...")
-        self.run_in_thread(analyze_data.main)
+        self.output_redirector.write(f"\n{SEPARATOR}\n")
+        self.set_status("⏳ Analyzing data...")
+        self.run_in_thread(run_module, 'analyze_data')
     
     def triathlon_analysis(self):
         if not Path("./data/activities.csv").exists():
             messagebox.showwarning("No Data", "No data found. Please download data first.")
             return
-        self.output_text.insert(tk.END, "\n" + "="*70 + "\n")
-        self.status_var.set("⏳ Running triathlon analysis...")
-        self.run_in_thread(triathlon_analysis.main)
+        self.output_redirector.write(f"\n{SEPARATOR}\n")
+        self.set_status("⏳ Running triathlon analysis...")
+        self.run_in_thread(run_module, 'triathlon_analysis')
     
     def coach_brief(self):
         if not Path("./data/activities.csv").exists():
             messagebox.showwarning("No Data", "No data found. Please download data first.")
             return
-        self.output_text.insert(tk.END, "\n" + "="*70 + "\n")
-        self.status_var.set("⏳ Generating coaching brief...")
+        self.output_redirector.write(f"\n{SEPARATOR}\n")
+        self.set_status("⏳ Generating coaching brief...")
         
         def run_and_save_prompt():
-            coaching_brief.main()
+            run_module('coaching_brief')
             # After generating, save AI prompt to file
             output_file = self.save_ai_prompt_to_file()
             if output_file:
@@ -234,25 +438,23 @@ class GarminAnalyzerGUI:
         
         self.run_in_thread(run_and_save_prompt)
     
+    def load_ai_prompt(self):
+        """Return the AI coach prompt from the coaching brief JSON, or '' if there is none"""
+        # Imported here so the GUI opens without loading pandas and numpy
+        import coaching_brief
+        brief_path = coaching_brief.COACHING_BRIEF_JSON
+        if not brief_path.exists():
+            return ''
+        # read_json only re-parses the brief when its mtime changes
+        return coaching_brief.read_json(brief_path).get('ai_coach_prompt', '')
+    
     def save_ai_prompt_to_file(self):
         """Save AI coach prompt to a text file in ~/Documents/coaches_brief/"""
-        # Read the coaching brief JSON to extract AI prompt
-        brief_path = Path("./data/coaching_brief.json")
-        if not brief_path.exists():
-            return
-        
-        import json
-        from datetime import datetime
-        
-        with open(brief_path, 'r') as f:
-            brief_data = json.load(f)
-        
-        ai_prompt = brief_data.get('ai_coach_prompt', '')
+        ai_prompt = self.load_ai_prompt()
         if not ai_prompt:
             return
         
         # Create output directory
-        import os
         output_dir = Path(os.path.expanduser('~/Documents/coaches_brief'))
         output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -269,16 +471,7 @@ class GarminAnalyzerGUI:
     
     def show_ai_prompt_dialog(self):
         """Show dialog with AI coach prompt and copy button"""
-        # Read the coaching brief JSON to extract AI prompt
-        brief_path = Path("./data/coaching_brief.json")
-        if not brief_path.exists():
-            return
-        
-        import json
-        with open(brief_path, 'r') as f:
-            brief_data = json.load(f)
-        
-        ai_prompt = brief_data.get('ai_coach_prompt', '')
+        ai_prompt = self.load_ai_prompt()
         if not ai_prompt:
             return
         
@@ -363,38 +556,43 @@ class GarminAnalyzerGUI:
         if not Path("./data/activities.csv").exists():
             messagebox.showwarning("No Data", "No data found. Please download data first.")
             return
-        self.output_text.insert(tk.END, "\n" + "="*70 + "\n")
-        self.status_var.set("⏳ Creating visualizations...")
+        self.output_redirector.write(f"\n{SEPARATOR}\n")
+        self.set_status("⏳ Creating visualizations...")
         def run_and_refresh():
-            visualize_data.main()
+            run_module('visualize_data')
             self.root.after(1000, self.load_visualizations)
         self.run_in_thread(run_and_refresh)
     
     def run_all(self):
-        self.output_text.insert(tk.END, "\n" + "="*70 + "\n")
-        self.output_text.insert(tk.END, "Starting complete pipeline...\n")
-        self.output_text.insert(tk.END, "="*70 + "\n")
-        self.status_var.set("⏳ Running complete pipeline...")
+        self.output_redirector.write(f"\n{SEPARATOR}\n")
+        self.output_redirector.write("Starting complete pipeline...\n")
+        self.output_redirector.write(f"{SEPARATOR}\n")
+        self.set_status("⏳ Running complete pipeline...")
         def run_pipeline():
-            download_data.main()
-            self.output_text.insert(tk.END, "\n")
-            analyze_data.main()
-            self.output_text.insert(tk.END, "\n")
-            triathlon_analysis.main()
-            self.output_text.insert(tk.END, "\n")
-            coaching_brief.main()
-            self.output_text.insert(tk.END, "\n")
-            visualize_data.main()
+            run_module('download_data')
+            # The remaining stages only read the downloaded files, so run them side by side.
+            # The first streams live; the others buffer and are shown in pipeline order.
+            stages = ['analyze_data', 'triathlon_analysis', 'coaching_brief', 'visualize_data']
+            outputs = [sys.stdout] + [io.StringIO() for _ in stages[1:]]
+            with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+                futures = [executor.submit(run_module, module, output) for module, output in zip(stages, outputs)]
+                for index, (future, output) in enumerate(zip(futures, outputs)):
+                    print()
+                    error = future.exception()
+                    if index:
+                        sys.stdout.write(output.getvalue())
+                    if error:
+                        raise error
             self.root.after(1000, self.load_visualizations)
         self.run_in_thread(run_pipeline)
     
     def save_output(self):
         """Save the entire output text to a file"""
-        from datetime import datetime
-        import os
-        
-        output_content = self.output_text.get(1.0, tk.END).strip()
-        if not output_content:
+        self.output_redirector.flush_to_widget()
+        log = self.output_redirector.log
+        log.flush()
+        output_size = os.path.getsize(log.name)
+        if not output_size:
             messagebox.showinfo("No Output", "There is no output to save.")
             return
         
@@ -406,19 +604,19 @@ class GarminAnalyzerGUI:
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
         output_file = output_dir / f"analysis_output_{timestamp}.txt"
         
-        # Write output to file
-        with open(output_file, 'w') as f:
-            f.write(output_content)
+        # Copy the output log to file
+        shutil.copyfile(log.name, output_file)
         
         messagebox.showinfo(
             "✓ Output Saved!",
             f"Analysis output saved to:\n\n{output_file}\n\n"
-            f"File size: {len(output_content)} characters"
+            f"File size: {output_size} bytes"
         )
     
     def clear_output(self):
         self.output_text.delete(1.0, tk.END)
-        self.status_var.set("Ready")
+        self.output_redirector.clear_log()
+        self.set_status("Ready")
     
     def quit_app(self):
         """Quit the application"""
@@ -429,6 +627,8 @@ class GarminAnalyzerGUI:
             )
             if not response:
                 return
+        self.prefetch_pool.shutdown(wait=False)
+        self.thumbnail_pool.shutdown(wait=False)
         self.root.quit()
         self.root.destroy()
     
@@ -453,30 +653,32 @@ class GarminAnalyzerGUI:
         canvas = tk.Canvas(self.fullscreen_window, bg='black', highlightthickness=0)
         canvas.pack(fill=tk.BOTH, expand=True)
         
-        # Force window update and wait for it to be fully rendered
-        self.fullscreen_window.update()
-        
-        # Now get actual canvas dimensions after window is rendered
-        canvas_width = canvas.winfo_width()
-        canvas_height = canvas.winfo_height()
+        # The fullscreen canvas covers the whole screen, so no update() is needed to measure it
+        canvas_width = self.fullscreen_window.winfo_screenwidth()
+        canvas_height = self.fullscreen_window.winfo_screenheight()
         
-        # Load and display image at full screen size
-        image = Image.open(image_path)
-        
-        # Scale to fit canvas - use 0.95 to leave small margin
-        img_width, img_height = image.size
-        scale = min(canvas_width / img_width, canvas_height / img_height) * 0.95
-        new_width = int(img_width * scale)
-        new_height = int(img_height * scale)
-        
-        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(image)
+        # The screen size never changes, so reopening the same image reuses its scaled copy
+        key = (str(image_path), image_path.stat().st_mtime_ns, canvas_width, canvas_height)
+        photo = self.fullscreen_cache.get(key)
+        if photo is not None:
+            self.fullscreen_cache.move_to_end(key)
+        else:
+            # Load and display image at full screen size
+            image = Image.open(image_path)
+            
+            # Scale to fit canvas - use 0.95 to leave small margin
+            image.thumbnail((int(canvas_width * 0.95), int(canvas_height * 0.95)),
+                            Image.Resampling.LANCZOS, reducing_gap=2.0)
+            photo = ImageTk.PhotoImage(image)
+            self.fullscreen_cache[key] = photo
+            if len(self.fullscreen_cache) > FULLSCREEN_CACHE_SIZE:
+                self.fullscreen_cache.popitem(last=False)
         
         canvas.create_image(canvas_width // 2, canvas_height // 2, image=photo, anchor=tk.CENTER)
         canvas.image = photo  # Keep reference
         
         # Add instructions
-        canvas.create_text(screen_width // 2, screen_height - 30, 
+        canvas.create_text(canvas_width // 2, canvas_height - 30, 
                          text="Press ESC or click to exit fullscreen", 
                          fill='white', font=('Arial', 14))
     
@@ -494,10 +696,6 @@ class GarminAnalyzerGUI:
         settings_window.transient(self.root)
         settings_window.grab_set()
         
-        # Load current .env values
-        from dotenv import load_dotenv
-        load_dotenv()
-        
         main_frame = ttk.Frame(settings_window, padding="20")
         main_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -515,7 +713,7 @@ class GarminAnalyzerGUI:
         email_frame = ttk.Frame(account_tab)
         email_frame.pack(fill=tk.X, pady=5)
         ttk.Label(email_frame, text="Email:", width=15).pack(side=tk.LEFT)
-        garmin_email_var = tk.StringVar(value=os.getenv('GARMIN_EMAIL', ''))
+        garmin_email_var = tk.StringVar(value=self.env.get('GARMIN_EMAIL', ''))
         email_entry = ttk.Entry(email_frame, textvariable=garmin_email_var, width=35)
         email_entry.pack(side=tk.LEFT, padx=5)
         
@@ -523,7 +721,7 @@ class GarminAnalyzerGUI:
         password_frame = ttk.Frame(account_tab)
         password_frame.pack(fill=tk.X, pady=5)
         ttk.Label(password_frame, text="Password:", width=15).pack(side=tk.LEFT)
-        garmin_password_var = tk.StringVar(value=os.getenv('GARMIN_PASSWORD', ''))
+        garmin_password_var = tk.StringVar(value=self.env.get('GARMIN_PASSWORD', ''))
         password_entry = ttk.Entry(password_frame, textvariable=garmin_password_var, width=35, show='•')
         password_entry.pack(side=tk.LEFT, padx=5)
         
@@ -551,44 +749,50 @@ Security Tips:
         
         ttk.Label(account_help, text=help_text, justify=tk.LEFT, wraplength=520).pack()
         
-        # ===== RACE PLANNING TAB =====
+        # ===== RACE PLANNING AND ANALYSIS PERIOD TABS =====
+        # Their variables exist up front for save_settings; the widgets are built on first view
         race_tab = ttk.Frame(notebook, padding="10")
         notebook.add(race_tab, text="🏁 Race Planning")
+        race_date_var = tk.StringVar(value=self.env.get('RACE_DATE', ''))
+        race_type_var = tk.StringVar(value=self.env.get('RACE_TYPE', ''))
+        race_priority_var = tk.StringVar(value=self.env.get('RACE_PRIORITY', 'A'))
+        
+        analysis_tab = ttk.Frame(notebook, padding="10")
+        notebook.add(analysis_tab, text="📊 Analysis Period")
+        analysis_days_var = tk.StringVar(value=self.env.get('ANALYSIS_DAYS', '60'))
         
-        ttk.Label(race_tab, text="Race Configuration", font=("Arial", 12, "bold")).pack(pady=(0, 15))
-        
-        # Race Date
-        date_frame = ttk.Frame(race_tab)
-        date_frame.pack(fill=tk.X, pady=5)
-        ttk.Label(date_frame, text="Race Date:", width=15).pack(side=tk.LEFT)
-        race_date_var = tk.StringVar(value=os.getenv('RACE_DATE', ''))
-        race_date_entry = ttk.Entry(date_frame, textvariable=race_date_var, width=20)
-        race_date_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(date_frame, text="(YYYY-MM-DD)", foreground='gray').pack(side=tk.LEFT)
-        
-        # Race Type
-        type_frame = ttk.Frame(race_tab)
-        type_frame.pack(fill=tk.X, pady=5)
-        ttk.Label(type_frame, text="Race Type:", width=15).pack(side=tk.LEFT)
-        race_type_var = tk.StringVar(value=os.getenv('RACE_TYPE', ''))
-        race_type_combo = ttk.Combobox(type_frame, textvariable=race_type_var, width=18,
-                                       values=['sprint', 'olympic', 'half_ironman', 'full_ironman', 'triple_t'])
-        race_type_combo.pack(side=tk.LEFT, padx=5)
-        
-        # Race Priority
-        priority_frame = ttk.Frame(race_tab)
-        priority_frame.pack(fill=tk.X, pady=5)
-        ttk.Label(priority_frame, text="Priority:", width=15).pack(side=tk.LEFT)
-        race_priority_var = tk.StringVar(value=os.getenv('RACE_PRIORITY', 'A'))
-        priority_combo = ttk.Combobox(priority_frame, textvariable=race_priority_var, width=18,
-                                      values=['A', 'B', 'C'])
-        priority_combo.pack(side=tk.LEFT, padx=5)
-        
-        # Help text for race planning
-        race_help = ttk.LabelFrame(race_tab, text="ℹ️ Race Planning Guide", padding="10")
-        race_help.pack(fill=tk.BOTH, expand=True, pady=15)
-        
-        race_help_text = """Race Types:
+        def build_race_tab():
+            ttk.Label(race_tab, text="Race Configuration", font=("Arial", 12, "bold")).pack(pady=(0, 15))
+            
+            # Race Date
+            date_frame = ttk.Frame(race_tab)
+            date_frame.pack(fill=tk.X, pady=5)
+            ttk.Label(date_frame, text="Race Date:", width=15).pack(side=tk.LEFT)
+            race_date_entry = ttk.Entry(date_frame, textvariable=race_date_var, width=20)
+            race_date_entry.pack(side=tk.LEFT, padx=5)
+            ttk.Label(date_frame, text="(YYYY-MM-DD)", foreground='gray').pack(side=tk.LEFT)
+            
+            # Race Type
+            type_frame = ttk.Frame(race_tab)
+            type_frame.pack(fill=tk.X, pady=5)
+            ttk.Label(type_frame, text="Race Type:", width=15).pack(side=tk.LEFT)
+            race_type_combo = ttk.Combobox(type_frame, textvariable=race_type_var, width=18,
+                                           values=['sprint', 'olympic', 'half_ironman', 'full_ironman', 'triple_t'])
+            race_type_combo.pack(side=tk.LEFT, padx=5)
+            
+            # Race Priority
+            priority_frame = ttk.Frame(race_tab)
+            priority_frame.pack(fill=tk.X, pady=5)
+            ttk.Label(priority_frame, text="Priority:", width=15).pack(side=tk.LEFT)
+            priority_combo = ttk.Combobox(priority_frame, textvariable=race_priority_var, width=18,
+                                          values=['A', 'B', 'C'])
+            priority_combo.pack(side=tk.LEFT, padx=5)
+            
+            # Help text for race planning
+            race_help = ttk.LabelFrame(race_tab, text="ℹ️ Race Planning Guide", padding="10")
+            race_help.pack(fill=tk.BOTH, expand=True, pady=15)
+            
+            race_help_text = """Race Types:
 • sprint - Sprint distance triathlon
 • olympic - Olympic distance triathlon
 • half_ironman - 70.3 distance
@@ -607,43 +811,35 @@ Race Priority:
 Off-Season:
 • Leave race date empty for off-season training
 • Focus on base building and technique work"""
+            
+            ttk.Label(race_help, text=race_help_text, justify=tk.LEFT, wraplength=520).pack()
         
-        ttk.Label(race_help, text=race_help_text, justify=tk.LEFT, wraplength=520).pack()
-        
-        # ===== ANALYSIS PERIOD TAB =====
-        analysis_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(analysis_tab, text="📊 Analysis Period")
-        
-        ttk.Label(analysis_tab, text="Performance Analysis Settings", font=("Arial", 12, "bold")).pack(pady=(0, 15))
-        
-        # Analysis Period Section
-        period_frame = ttk.LabelFrame(analysis_tab, text="Analysis Period (Performance Metrics)", padding="15")
-        period_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        # Read current value from .env
-        current_days = os.getenv('ANALYSIS_DAYS', '60')
-        
-        ttk.Label(period_frame, text="Select how many days of training data to analyze:").pack(anchor=tk.W, pady=(0, 10))
-        
-        # Radio buttons for analysis period
-        analysis_days_var = tk.StringVar(value=current_days)
-        
-        periods = [
-            ("7", "7 days - Recent trends (returning from break)"),
-            ("30", "30 days - Monthly view (current training block)"),
-            ("60", "60 days - Long-term patterns (RECOMMENDED)"),
-            ("90", "90 days - Seasonal view (full build)")
-        ]
-        
-        for value, label in periods:
-            rb = ttk.Radiobutton(period_frame, text=label, variable=analysis_days_var, value=value)
-            rb.pack(anchor=tk.W, pady=2)
-        
-        # Analysis help text
-        analysis_help = ttk.LabelFrame(analysis_tab, text="ℹ️ Analysis Period Guide", padding="10")
-        analysis_help.pack(fill=tk.BOTH, expand=True, pady=15)
-        
-        analysis_help_text = """Performance Metrics (Configurable):
+        def build_analysis_tab():
+            ttk.Label(analysis_tab, text="Performance Analysis Settings", font=("Arial", 12, "bold")).pack(pady=(0, 15))
+            
+            # Analysis Period Section
+            period_frame = ttk.LabelFrame(analysis_tab, text="Analysis Period (Performance Metrics)", padding="15")
+            period_frame.pack(fill=tk.X, pady=(0, 15))
+            
+            ttk.Label(period_frame, text="Select how many days of training data to analyze:").pack(anchor=tk.W, pady=(0, 10))
+            
+            # Radio buttons for analysis period
+            periods = [
+                ("7", "7 days - Recent trends (returning from break)"),
+                ("30", "30 days - Monthly view (current training block)"),
+                ("60", "60 days - Long-term patterns (RECOMMENDED)"),
+                ("90", "90 days - Seasonal view (full build)")
+            ]
+            
+            for value, label in periods:
+                rb = ttk.Radiobutton(period_frame, text=label, variable=analysis_days_var, value=value)
+                rb.pack(anchor=tk.W, pady=2)
+            
+            # Analysis help text
+            analysis_help = ttk.LabelFrame(analysis_tab, text="ℹ️ Analysis Period Guide", padding="10")
+            analysis_help.pack(fill=tk.BOTH, expand=True, pady=15)
+            
+            analysis_help_text = """Performance Metrics (Configurable):
 • HR Zone Distribution (Z1-Z2, Z3, Z4-Z5)
 • Run Aerobic Decoupling
 • Swim SWOLF efficiency
@@ -663,69 +859,51 @@ Recommendations:
 • Use 7 days when returning from a break
 • Use 30 days for mid-block assessments
 • Use 90 days for full season reviews"""
+            
+            ttk.Label(analysis_help, text=analysis_help_text, justify=tk.LEFT, wraplength=520).pack()
         
-        ttk.Label(analysis_help, text=analysis_help_text, justify=tk.LEFT, wraplength=520).pack()
+        tab_builders = {1: build_race_tab, 2: build_analysis_tab}
+        def on_tab_changed(event):
+            builder = tab_builders.pop(notebook.index('current'), None)
+            if builder:
+                builder()
+        notebook.bind('<<NotebookTabChanged>>', on_tab_changed)
         
         # Buttons at the bottom of the window
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(15, 0))
         
         def save_settings():
+            saved = {
+                'GARMIN_EMAIL': garmin_email_var.get(),
+                'GARMIN_PASSWORD': garmin_password_var.get(),
+                'RACE_DATE': race_date_var.get(),
+                'RACE_TYPE': race_type_var.get(),
+                'RACE_PRIORITY': race_priority_var.get(),
+                'ANALYSIS_DAYS': analysis_days_var.get(),
+            }
+            
             # Read current .env
             env_path = Path('.env')
-            if env_path.exists():
-                with open(env_path, 'r') as f:
-                    lines = f.readlines()
-            else:
-                lines = []
-            
-            # Update settings
-            new_lines = []
-            found_email = found_password = False
-            found_date = found_type = found_priority = False
-            found_analysis_days = False
+            text = env_path.read_text(encoding='utf-8') if env_path.exists() else ''
             
-            for line in lines:
-                if line.startswith('GARMIN_EMAIL='):
-                    new_lines.append(f"GARMIN_EMAIL={garmin_email_var.get()}\n")
-                    found_email = True
-                elif line.startswith('GARMIN_PASSWORD='):
-                    new_lines.append(f"GARMIN_PASSWORD={garmin_password_var.get()}\n")
-                    found_password = True
-                elif line.startswith('RACE_DATE='):
-                    new_lines.append(f"RACE_DATE={race_date_var.get()}\n")
-                    found_date = True
-                elif line.startswith('RACE_TYPE='):
-                    new_lines.append(f"RACE_TYPE={race_type_var.get()}\n")
-                    found_type = True
-                elif line.startswith('RACE_PRIORITY='):
-                    new_lines.append(f"RACE_PRIORITY={race_priority_var.get()}\n")
-                    found_priority = True
-                elif line.startswith('ANALYSIS_DAYS='):
-                    new_lines.append(f"ANALYSIS_DAYS={analysis_days_var.get()}\n")
-                    found_analysis_days = True
-                else:
-                    new_lines.append(line)
-            
-            # Add if not found
-            if not found_email:
-                new_lines.append(f"GARMIN_EMAIL={garmin_email_var.get()}\n")
-            if not found_password:
-                new_lines.append(f"GARMIN_PASSWORD={garmin_password_var.get()}\n")
-            if not found_date:
-                new_lines.append(f"RACE_DATE={race_date_var.get()}\n")
-            if not found_type:
-                new_lines.append(f"RACE_TYPE={race_type_var.get()}\n")
-            if not found_priority:
-                new_lines.append(f"RACE_PRIORITY={race_priority_var.get()}\n")
-            if not found_analysis_days:
-                new_lines.append(f"ANALYSIS_DAYS={analysis_days_var.get()}\n")
-            if not found_priority:
-                new_lines.append(f"RACE_PRIORITY={race_priority_var.get()}\n")
+            # Update settings in place, then append any that were not found
+            missing = []
+            for key, value in saved.items():
+                text, count = ENV_KEY_PATTERNS[key].subn(lambda m: f"{key}={value}", text)
+                if not count:
+                    missing.append(key)
+            if missing and text and not text.endswith('\n'):
+                text += '\n'
+            text += ''.join(f"{key}={saved[key]}\n" for key in missing)
             
             # Write back
-            with open(env_path, 'w') as f:
-                f.writelines(new_lines)
+            env_path.write_text(text, encoding='utf-8')
+            
+            # Child processes inherit os.environ, and load_dotenv never overrides it,
+            # so keep the environment in step with the file
+            os.environ.update(saved)
+            self.env.update(saved)
             
             # Show success message
             save_message = "Settings saved successfully!\n\n"
@@ -746,21 +924,48 @@ Recommendations:
             
             # Show testing message
             test_button.config(state='disabled', text="Testing...")
-            settings_window.update()
+            test_progress.pack(pady=(0, 10))
+            test_progress.start(10)
             
-            try:
-                from garminconnect import Garmin
-                client = Garmin(garmin_email_var.get(), garmin_password_var.get())
-                client.login()
-                messagebox.showinfo("Success", "✓ Connection successful!\n\nGarmin credentials are valid.")
-                test_button.config(state='normal', text="🔌 Test Connection")
-            except Exception as e:
-                messagebox.showerror("Connection Failed", f"✗ Could not connect to Garmin:\n\n{str(e)}\n\nPlease check your credentials.")
+            def show_result(error):
+                if not test_button.winfo_exists():
+                    return  # Settings window was closed while logging in
+                test_progress.stop()
+                test_progress.pack_forget()
                 test_button.config(state='normal', text="🔌 Test Connection")
+                if error is None:
+                    messagebox.showinfo("Success", "✓ Connection successful!\n\nGarmin credentials are valid.", parent=settings_window)
+                else:
+                    messagebox.showerror("Connection Failed", f"✗ Could not connect to Garmin:\n\n{str(error)}\n\nPlease check your credentials.", parent=settings_window)
+            
+            # Log in off the Tk thread so the dialog keeps repainting
+            email, password = garmin_email_var.get(), garmin_password_var.get()
+            def session_is_valid():
+                # A cheap API call on the previous client avoids a new handshake and token fetch
+                if not self.garmin_session or self.garmin_session[:2] != (email, password):
+                    return False
+                try:
+                    self.garmin_session[2].get_user_profile()
+                    return True
+                except Exception:
+                    return False
+            def login():
+                try:
+                    if not session_is_valid():
+                        from garminconnect import Garmin
+                        client = Garmin(email, password)
+                        client.login()
+                        self.garmin_session = (email, password, client)
+                    error = None
+                except Exception as e:
+                    error = e
+                self.root.after(0, lambda: show_result(error))
+            threading.Thread(target=login, daemon=True).start()
         
         # Test connection button (only visible in account tab)
         test_button = ttk.Button(account_tab, text="🔌 Test Connection", command=test_garmin_connection)
         test_button.pack(pady=10)
+        test_progress = ttk.Progressbar(account_tab, mode='indeterminate', length=200)
         
         # Save and Cancel buttons
         ttk.Button(button_frame, text="💾 Save All Settings", command=save_settings, width=20).pack(side=tk.LEFT, padx=5)
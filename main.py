@@ -8,6 +8,8 @@ import sys
 import argparse
 from pathlib import Path
 
+SEPARATOR = "=" * 70
+
 def main():
     """Main function with command-line interface."""
     parser = argparse.ArgumentParser(
@@ -29,17 +31,27 @@ Examples:
         choices=['all', 'download', 'analyze', 'triathlon', 'coach', 'visualize'],
         help='Action to perform'
     )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore cached Garmin responses when downloading'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Keep every activity field Garmin returns in activities.json'
+    )
     
     args = parser.parse_args()
     
-    print("="*70)
+    print(SEPARATOR)
     print(" " * 20 + "GARMIN DATA ANALYSIS APP")
-    print("="*70)
+    print(SEPARATOR)
     
     if args.action in ['all', 'download']:
         print("\n[1/4] DOWNLOADING DATA...")
         import download_data
-        download_data.main()
+        download_data.main(refresh=args.refresh, full=args.full)
         
         if args.action == 'download':
             return
@@ -74,9 +86,9 @@ Examples:
         visualize_data.main()
     
     if args.action == 'all':
-        print("\n" + "="*70)
+        print(f"\n{SEPARATOR}")
         print("✓ COMPLETE PIPELINE FINISHED!")
-        print("="*70)
+        print(SEPARATOR)
         print("\nYour Garmin data has been:")
         print("  ✓ Downloaded from Garmin Connect")
         print("  ✓ Analyzed for statistics and trends")
@@ -2,12 +2,249 @@
 """
 Periodization Module - Training phase detection and planning
 """
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from functools import lru_cache
+from datetime import date, datetime
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Phase lookup for calculate_training_phase: lower bound in weeks to race -> phase
+PHASE_BOUNDARIES = (0, 2, 4, 8, 12, 20)
+PHASE_BY_BOUNDARY = ('RACE_WEEK', 'TAPER', 'PEAK', 'BUILD', 'BASE', 'OFF_SEASON')
+PHASE_DESCRIPTIONS = {
+    'RECOVERY': 'Post-race recovery - Easy aerobic work only',
+    'RACE_WEEK': 'Race week - Short openers, rest, final prep',
+    'TAPER': 'Taper phase - Reduce volume 30-50%, maintain intensity',
+    'PEAK': 'Peak phase - Race-specific intensity, VO2 max work',
+    'BUILD': 'Build phase - Sweet Spot, tempo, race-specific volume',
+    'BASE': 'Base phase - High volume, low intensity, Zone 2 focus',
+    'OFF_SEASON': 'Off-season - General fitness, cross-training'
+}
+
+# calculate_training_phase results per phase; weeks_to_race is filled in per call
+PHASE_RESULTS = {
+    phase: {'phase': phase, 'weeks_to_race': None, 'description': description}
+    for phase, description in PHASE_DESCRIPTIONS.items()
+}
+NO_RACE_RESULT = {
+    'phase': 'OFF_SEASON',
+    'weeks_to_race': None,
+    'description': 'No race planned - General fitness maintenance'
+}
+
+# Base training guidance per phase, built once at import
+PHASE_RECOMMENDATIONS = {
+    'OFF_SEASON': {
+        'weekly_tss': 300,
+        'intensity_split': '90% Z1-Z2, 10% Z3+',
+        'workout_types': ['Endurance', 'Easy Recovery'],
+        'focus': 'General fitness, cross-training, skill work',
+        'trainerroad_workouts': [
+            'Pettit (39 TSS, IF 0.56)',
+            'Boarstone (60 TSS, IF 0.68)',
+            'Gibbs (75 TSS, IF 0.70)'
+        ]
+    },
+    'BASE': {
+        'weekly_tss': 400,
+        'intensity_split': '80% Z1-Z2, 20% Z3+',
+        'workout_types': ['Endurance', 'Sweet Spot (1x/week)'],
+        'focus': 'Aerobic base, mitochondrial density, fat adaptation',
+        'trainerroad_workouts': [
+            'Warren (60 TSS, IF 0.69) - Endurance',
+            'Boarstone +3 (88 TSS, IF 0.70) - Long endurance',
+            'Carson (60 TSS, IF 0.88) - Weekly sweet spot'
+        ]
+    },
+    'BUILD': {
+        'weekly_tss': 450,
+        'intensity_split': '70% Z1-Z2, 30% Z3+',
+        'workout_types': ['Sweet Spot', 'Tempo', 'Endurance'],
+        'focus': 'Lactate threshold, race-specific intensity',
+        'trainerroad_workouts': [
+            'Antelope (70 TSS, IF 0.89) - Sweet spot intervals',
+            'Tallac (67 TSS, IF 0.90) - Tempo',
+            'Warren (60 TSS, IF 0.69) - Recovery endurance'
+        ]
+    },
+    'PEAK': {
+        'weekly_tss': 500,
+        'intensity_split': '60% Z1-Z2, 40% Z3+',
+        'workout_types': ['VO2 Max', 'Threshold', 'Race Simulation'],
+        'focus': 'Peak fitness, race-specific power, neuromuscular prep',
+        'trainerroad_workouts': [
+            'Spencer (49 TSS, IF 1.00) - VO2 max',
+            'Lamarck (69 TSS, IF 0.95) - Threshold',
+            'McAdie (71 TSS, IF 0.94) - Over-unders'
+        ]
+    },
+    'TAPER': {
+        'weekly_tss': 250,
+        'intensity_split': '70% Z1-Z2, 30% Z3+ (short bursts)',
+        'workout_types': ['Openers', 'Short Intensity', 'Easy Spin'],
+        'focus': 'Maintain sharpness, shed fatigue, mental prep',
+        'trainerroad_workouts': [
+            'Truuli -2 (30 TSS, IF 0.70) - Opener',
+            'Lazy Mountain (24 TSS, IF 0.46) - Recovery',
+            'Pettit (39 TSS, IF 0.56) - Easy spin'
+        ]
+    },
+    'RACE_WEEK': {
+        'weekly_tss': 150,
+        'intensity_split': '80% Z1-Z2, 20% Z3+ (openers only)',
+        'workout_types': ['Openers', 'Easy Recovery'],
+        'focus': 'Rest, pre-race openers, carb loading',
+        'trainerroad_workouts': [
+            'Truuli -2 (30 TSS, IF 0.70) - 2 days before race',
+            'Lazy Mountain (24 TSS, IF 0.46) - Easy spin',
+            'REST - Day before race'
+        ]
+    },
+    'RECOVERY': {
+        'weekly_tss': 200,
+        'intensity_split': '100% Z1-Z2',
+        'workout_types': ['Easy Recovery', 'Active Rest'],
+        'focus': 'Active recovery, rebuild glycogen, repair tissue',
+        'trainerroad_workouts': [
+            'Lazy Mountain (24 TSS, IF 0.46)',
+            'Pettit (39 TSS, IF 0.56)',
+            'Boarstone (60 TSS, IF 0.68) - Week 2 only'
+        ]
+    }
+}
+
+# Triple T (multi-day stage race) overrides applied on top of PHASE_RECOMMENDATIONS
+TRIPLE_T_ADJUSTMENTS = {
+    'BASE': {
+        'weekly_tss': 450,  # Higher volume for durability
+        'focus': 'Aerobic durability, back-to-back training days, brick workouts',
+        'trainerroad_workouts': PHASE_RECOMMENDATIONS['BASE']['trainerroad_workouts'] + [
+            'SPECIAL: 3-day training blocks (Sat-Sun-Mon) to simulate race format'
+        ]
+    },
+    'BUILD': {
+        'weekly_tss': 500,  # Increased for multi-day capacity
+        'intensity_split': '65% Z1-Z2, 35% Z3+',  # More intensity tolerance needed
+        'focus': 'Back-to-back race-pace efforts, recovery between races, heat adaptation',
+        'trainerroad_workouts': [
+            'Friday: Antelope (70 TSS, IF 0.89) - PM race simulation',
+            'Saturday AM: Tallac (67 TSS, IF 0.90) - 4hr recovery',
+            'Saturday PM: Carson (60 TSS, IF 0.88) - 6hr recovery',
+            'Sunday: McAdie (71 TSS, IF 0.94) - Olympic pace'
+        ]
+    },
+    'PEAK': {
+        'weekly_tss': 550,  # Peak for multi-day
+        'focus': 'Triple-brick weekends (3 races in 3 days), race nutrition rehearsal, cumulative fatigue management',
+        'trainerroad_workouts': [
+            'RACE SIMULATION WEEKEND:',
+            'Friday 6pm: Super Sprint effort (30-40 TSS)',
+            'Saturday 8am: Sprint effort (60-70 TSS)',
+            'Saturday 2pm: Sprint effort (60-70 TSS)',
+            'Sunday 8am: Olympic effort (90-100 TSS)'
+        ]
+    },
+    'TAPER': {
+        'weekly_tss': 300,  # Longer taper for multi-day event
+        'focus': 'Extra recovery for 3-day event, practice transitions, race nutrition final checks',
+        'trainerroad_workouts': [
+            'Week 1: 2x opener workouts, rest of easy spin',
+            'Race week: Truuli -2 on Monday/Wednesday, complete rest Thursday'
+        ]
+    },
+    'RACE_WEEK': {
+        'weekly_tss': 180,  # Slightly higher for 3-day race prep
+        'focus': 'REST for multi-day event, pack gear for 4 races, hydration/nutrition plan',
+        'trainerroad_workouts': [
+            'Monday: Pettit (39 TSS, IF 0.56)',
+            'Tuesday: Truuli -2 (30 TSS, IF 0.70)',
+            'Wednesday: Complete REST',
+            'Thursday: Complete REST',
+            'Friday: Pre-race swim/bike check only (no workout)'
+        ]
+    },
+    'RECOVERY': {
+        'weekly_tss': 150,  # Extended recovery after 4 races
+        'focus': 'Extended recovery (2 weeks minimum), massage, nutrition replenishment',
+        'trainerroad_workouts': [
+            'Week 1: Complete REST or easy 20min spins only',
+            'Week 2: Lazy Mountain (24 TSS) every other day',
+            'Week 3: Return to 200 TSS with all endurance'
+        ]
+    }
+}
+
+
+# Recovery-only plan used regardless of phase when ACWR signals injury risk
+INJURY_OVERRIDE_RECOMMENDATION = {
+    'weekly_tss': 200,
+    'intensity_split': '100% Z1-Z2',
+    'workout_types': ['Recovery Only'],
+    'focus': '⚠️ INJURY RISK OVERRIDE - Active recovery only',
+    'trainerroad_workouts': [
+        'Lazy Mountain (24 TSS, IF 0.46)',
+        'Pettit (39 TSS, IF 0.56)',
+        'REST DAYS as needed'
+    ]
+}
+
+# Static sections of the AI coach prompt
+PROMPT_TRIPLE_T_DETAILS = """
+  Race Format - 4 triathlons in 3 days:
+    • Friday 6pm: Super Sprint (400m swim, 10mi bike, 2mi run)
+    • Saturday 8am: Sprint (750m swim, 20km bike, 5km run)
+    • Saturday 2pm: Sprint (750m swim, 20km bike, 5km run)
+    • Sunday 8am: Olympic (1500m swim, 40km bike, 10km run)
+  Total Distance: 3000m swim, 90km bike, 22km run
+  Key Challenge: Cumulative fatigue, 4-6hr recovery between races, heat management
+"""
+
+PROMPT_REQUEST_HEADER = """
+🎯 WHAT I NEED FROM YOU:
+========================
+Please provide:
+
+1. **Immediate Next Steps** (this week):
+   - What TrainerRoad workout should I do tomorrow?
+   - Should I adjust volume or intensity based on my ACWR?
+   - Any red flags in my recovery metrics?
+
+2. **Medium-Term Plan** (next 4 weeks):
+"""
+
+PROMPT_NO_RACE_PLAN = """   - Should I set a goal race? If so, when and what distance?
+   - Weekly TSS targets for fitness maintenance
+   - How to balance swim/bike/run without a target race?
+   - Seasonal periodization suggestions
+
+3. **Long-Term Planning**:
+   - Should I plan a training season around A/B/C races?
+   - Off-season timing and focus
+"""
+
+PROMPT_FOOTER = """
+5. **TrainerRoad Workout Selection**:
+   - Given my current phase and metrics, which specific workouts from TrainerRoad?
+   - How many hard days per week should I do?
+   - When to schedule endurance vs. sweet spot vs. tempo?
+
+COACHING PHILOSOPHY:
+I follow polarized training (80/20 rule) and use TrainerRoad for structured indoor cycling. I want to avoid overtraining and injury while making steady progress toward race fitness.
+
+Please be specific with dates, TSS numbers, and workout names. Thank you!
+"""
+
+
+@lru_cache(maxsize=8)
+def parse_race_date(race_date_str):
+    """Parse a RACE_DATE value once; returns None if it is not YYYY-MM-DD"""
+    try:
+        return datetime.strptime(race_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
 
 def get_race_info():
     """Load race information from .env"""
@@ -18,15 +255,30 @@ def get_race_info():
     if not race_date_str:
         return None
     
-    try:
-        race_date = datetime.strptime(race_date_str, '%Y-%m-%d')
-        return {
-            'date': race_date,
-            'type': race_type,
-            'priority': race_priority
-        }
-    except:
+    race_date = parse_race_date(race_date_str)
+    if race_date is None:
         return None
+    return {
+        'date': race_date,
+        'type': race_type,
+        'priority': race_priority
+    }
+
+
+@lru_cache(maxsize=8)
+def classify_training_phase(race_date, today):
+    """Return (phase, weeks_to_race) for a race date as seen from today"""
+    days_to_race = (race_date - today).days
+    weeks_to_race = days_to_race / 7
+    
+    # Post-race recovery
+    if days_to_race < 0 and days_to_race > -14:
+        return 'RECOVERY', weeks_to_race
+    
+    # Weeks out falls in [PHASE_BOUNDARIES[i], PHASE_BOUNDARIES[i + 1]); beyond the
+    # last boundary, or more than two weeks after the race, is off-season
+    index = bisect_right(PHASE_BOUNDARIES, weeks_to_race) - 1
+    return (PHASE_BY_BOUNDARY[index] if index >= 0 else 'OFF_SEASON'), weeks_to_race
 
 
 def calculate_training_phase(race_date=None):
@@ -43,70 +295,30 @@ def calculate_training_phase(race_date=None):
     - RECOVERY: 1-2 weeks post-race - Active recovery
     """
     if not race_date:
-        return {
-            'phase': 'OFF_SEASON',
-            'weeks_to_race': None,
-            'description': 'No race planned - General fitness maintenance'
-        }
-    
-    today = datetime.now()
-    days_to_race = (race_date - today).days
-    weeks_to_race = days_to_race / 7
-    
-    # Post-race recovery
-    if days_to_race < 0 and days_to_race > -14:
-        return {
-            'phase': 'RECOVERY',
-            'weeks_to_race': weeks_to_race,
-            'description': 'Post-race recovery - Easy aerobic work only'
-        }
-    
-    # Race week
-    if 0 <= weeks_to_race < 2:
-        return {
-            'phase': 'RACE_WEEK',
-            'weeks_to_race': weeks_to_race,
-            'description': 'Race week - Short openers, rest, final prep'
-        }
+        return dict(NO_RACE_RESULT)
     
-    # Taper
-    if 2 <= weeks_to_race < 4:
-        return {
-            'phase': 'TAPER',
-            'weeks_to_race': weeks_to_race,
-            'description': 'Taper phase - Reduce volume 30-50%, maintain intensity'
-        }
+    phase, weeks_to_race = classify_training_phase(race_date, date.today())
     
-    # Peak
-    if 4 <= weeks_to_race < 8:
-        return {
-            'phase': 'PEAK',
-            'weeks_to_race': weeks_to_race,
-            'description': 'Peak phase - Race-specific intensity, VO2 max work'
-        }
+    result = dict(PHASE_RESULTS[phase])
+    result['weeks_to_race'] = weeks_to_race
+    return result
+
+
+@lru_cache(maxsize=32)
+def merge_phase_recommendations(phase, injury_risk, is_triple_t):
+    """Merge the shared recommendation tables for one phase; callers must copy the result"""
+    # Adjust for injury risk (overrides everything, so skip the phase lookup)
+    if injury_risk:
+        return INJURY_OVERRIDE_RECOMMENDATION
     
-    # Build
-    if 8 <= weeks_to_race < 12:
-        return {
-            'phase': 'BUILD',
-            'weeks_to_race': weeks_to_race,
-            'description': 'Build phase - Sweet Spot, tempo, race-specific volume'
-        }
+    # Get base recommendation for phase
+    base_rec = dict(PHASE_RECOMMENDATIONS.get(phase, PHASE_RECOMMENDATIONS['OFF_SEASON']))
     
-    # Base
-    if 12 <= weeks_to_race < 20:
-        return {
-            'phase': 'BASE',
-            'weeks_to_race': weeks_to_race,
-            'description': 'Base phase - High volume, low intensity, Zone 2 focus'
-        }
+    # TRIPLE T ADJUSTMENTS - Multi-day stage race requires different preparation
+    if is_triple_t:
+        base_rec.update(TRIPLE_T_ADJUSTMENTS.get(phase, {}))
     
-    # Off-season
-    return {
-        'phase': 'OFF_SEASON',
-        'weeks_to_race': weeks_to_race,
-        'description': 'Off-season - General fitness, cross-training'
-    }
+    return base_rec
 
 
 def get_phase_recommendations(phase, acwr=None, race_info=None):
@@ -117,164 +329,13 @@ def get_phase_recommendations(phase, acwr=None, race_info=None):
     Adjusted for race type (e.g., Triple T multi-day stage race).
     """
     # Check if this is a Triple T race (multi-day stage race requiring durability)
-    is_triple_t = race_info and race_info.get('type') == 'triple_t'
-    
-    recommendations = {
-        'OFF_SEASON': {
-            'weekly_tss': 300,
-            'intensity_split': '90% Z1-Z2, 10% Z3+',
-            'workout_types': ['Endurance', 'Easy Recovery'],
-            'focus': 'General fitness, cross-training, skill work',
-            'trainerroad_workouts': [
-                'Pettit (39 TSS, IF 0.56)',
-                'Boarstone (60 TSS, IF 0.68)',
-                'Gibbs (75 TSS, IF 0.70)'
-            ]
-        },
-        'BASE': {
-            'weekly_tss': 400,
-            'intensity_split': '80% Z1-Z2, 20% Z3+',
-            'workout_types': ['Endurance', 'Sweet Spot (1x/week)'],
-            'focus': 'Aerobic base, mitochondrial density, fat adaptation',
-            'trainerroad_workouts': [
-                'Warren (60 TSS, IF 0.69) - Endurance',
-                'Boarstone +3 (88 TSS, IF 0.70) - Long endurance',
-                'Carson (60 TSS, IF 0.88) - Weekly sweet spot'
-            ]
-        },
-        'BUILD': {
-            'weekly_tss': 450,
-            'intensity_split': '70% Z1-Z2, 30% Z3+',
-            'workout_types': ['Sweet Spot', 'Tempo', 'Endurance'],
-            'focus': 'Lactate threshold, race-specific intensity',
-            'trainerroad_workouts': [
-                'Antelope (70 TSS, IF 0.89) - Sweet spot intervals',
-                'Tallac (67 TSS, IF 0.90) - Tempo',
-                'Warren (60 TSS, IF 0.69) - Recovery endurance'
-            ]
-        },
-        'PEAK': {
-            'weekly_tss': 500,
-            'intensity_split': '60% Z1-Z2, 40% Z3+',
-            'workout_types': ['VO2 Max', 'Threshold', 'Race Simulation'],
-            'focus': 'Peak fitness, race-specific power, neuromuscular prep',
-            'trainerroad_workouts': [
-                'Spencer (49 TSS, IF 1.00) - VO2 max',
-                'Lamarck (69 TSS, IF 0.95) - Threshold',
-                'McAdie (71 TSS, IF 0.94) - Over-unders'
-            ]
-        },
-        'TAPER': {
-            'weekly_tss': 250,
-            'intensity_split': '70% Z1-Z2, 30% Z3+ (short bursts)',
-            'workout_types': ['Openers', 'Short Intensity', 'Easy Spin'],
-            'focus': 'Maintain sharpness, shed fatigue, mental prep',
-            'trainerroad_workouts': [
-                'Truuli -2 (30 TSS, IF 0.70) - Opener',
-                'Lazy Mountain (24 TSS, IF 0.46) - Recovery',
-                'Pettit (39 TSS, IF 0.56) - Easy spin'
-            ]
-        },
-        'RACE_WEEK': {
-            'weekly_tss': 150,
-            'intensity_split': '80% Z1-Z2, 20% Z3+ (openers only)',
-            'workout_types': ['Openers', 'Easy Recovery'],
-            'focus': 'Rest, pre-race openers, carb loading',
-            'trainerroad_workouts': [
-                'Truuli -2 (30 TSS, IF 0.70) - 2 days before race',
-                'Lazy Mountain (24 TSS, IF 0.46) - Easy spin',
-                'REST - Day before race'
-            ]
-        },
-        'RECOVERY': {
-            'weekly_tss': 200,
-            'intensity_split': '100% Z1-Z2',
-            'workout_types': ['Easy Recovery', 'Active Rest'],
-            'focus': 'Active recovery, rebuild glycogen, repair tissue',
-            'trainerroad_workouts': [
-                'Lazy Mountain (24 TSS, IF 0.46)',
-                'Pettit (39 TSS, IF 0.56)',
-                'Boarstone (60 TSS, IF 0.68) - Week 2 only'
-            ]
-        }
-    }
-    
-    # Get base recommendation for phase
-    base_rec = recommendations.get(phase, recommendations['OFF_SEASON']).copy()
-    
-    # TRIPLE T ADJUSTMENTS - Multi-day stage race requires different preparation
-    if is_triple_t:
-        if phase == 'BASE':
-            base_rec['weekly_tss'] = 450  # Higher volume for durability
-            base_rec['focus'] = 'Aerobic durability, back-to-back training days, brick workouts'
-            base_rec['trainerroad_workouts'].append('SPECIAL: 3-day training blocks (Sat-Sun-Mon) to simulate race format')
-        
-        elif phase == 'BUILD':
-            base_rec['weekly_tss'] = 500  # Increased for multi-day capacity
-            base_rec['intensity_split'] = '65% Z1-Z2, 35% Z3+'  # More intensity tolerance needed
-            base_rec['focus'] = 'Back-to-back race-pace efforts, recovery between races, heat adaptation'
-            base_rec['trainerroad_workouts'] = [
-                'Friday: Antelope (70 TSS, IF 0.89) - PM race simulation',
-                'Saturday AM: Tallac (67 TSS, IF 0.90) - 4hr recovery',
-                'Saturday PM: Carson (60 TSS, IF 0.88) - 6hr recovery',
-                'Sunday: McAdie (71 TSS, IF 0.94) - Olympic pace'
-            ]
-        
-        elif phase == 'PEAK':
-            base_rec['weekly_tss'] = 550  # Peak for multi-day
-            base_rec['focus'] = 'Triple-brick weekends (3 races in 3 days), race nutrition rehearsal, cumulative fatigue management'
-            base_rec['trainerroad_workouts'] = [
-                'RACE SIMULATION WEEKEND:',
-                'Friday 6pm: Super Sprint effort (30-40 TSS)',
-                'Saturday 8am: Sprint effort (60-70 TSS)',
-                'Saturday 2pm: Sprint effort (60-70 TSS)',
-                'Sunday 8am: Olympic effort (90-100 TSS)'
-            ]
-        
-        elif phase == 'TAPER':
-            base_rec['weekly_tss'] = 300  # Longer taper for multi-day event
-            base_rec['focus'] = 'Extra recovery for 3-day event, practice transitions, race nutrition final checks'
-            base_rec['trainerroad_workouts'] = [
-                'Week 1: 2x opener workouts, rest of easy spin',
-                'Race week: Truuli -2 on Monday/Wednesday, complete rest Thursday'
-            ]
-        
-        elif phase == 'RACE_WEEK':
-            base_rec['weekly_tss'] = 180  # Slightly higher for 3-day race prep
-            base_rec['focus'] = 'REST for multi-day event, pack gear for 4 races, hydration/nutrition plan'
-            base_rec['trainerroad_workouts'] = [
-                'Monday: Pettit (39 TSS, IF 0.56)',
-                'Tuesday: Truuli -2 (30 TSS, IF 0.70)',
-                'Wednesday: Complete REST',
-                'Thursday: Complete REST',
-                'Friday: Pre-race swim/bike check only (no workout)'
-            ]
-        
-        elif phase == 'RECOVERY':
-            base_rec['weekly_tss'] = 150  # Extended recovery after 4 races
-            base_rec['focus'] = 'Extended recovery (2 weeks minimum), massage, nutrition replenishment'
-            base_rec['trainerroad_workouts'] = [
-                'Week 1: Complete REST or easy 20min spins only',
-                'Week 2: Lazy Mountain (24 TSS) every other day',
-                'Week 3: Return to 200 TSS with all endurance'
-            ]
-    
-    # Adjust for injury risk (overrides everything)
-    if acwr and acwr > 1.5:
-        # Override with recovery regardless of phase
-        return {
-            'weekly_tss': 200,
-            'intensity_split': '100% Z1-Z2',
-            'workout_types': ['Recovery Only'],
-            'focus': '⚠️ INJURY RISK OVERRIDE - Active recovery only',
-            'trainerroad_workouts': [
-                'Lazy Mountain (24 TSS, IF 0.46)',
-                'Pettit (39 TSS, IF 0.56)',
-                'REST DAYS as needed'
-            ]
-        }
+    is_triple_t = bool(race_info and race_info.get('type') == 'triple_t')
+    injury_risk = bool(acwr and acwr > 1.5)
     
-    return base_rec
+    # Copy the nested lists too (workout types, workouts) so callers can't
+    # alter the cached result or the shared tables
+    return {key: list(value) if isinstance(value, list) else value
+            for key, value in merge_phase_recommendations(phase, injury_risk, is_triple_t).items()}
 
 
 def generate_ai_coach_prompt(coaching_data, phase_info, phase_recs):
@@ -283,25 +344,26 @@ def generate_ai_coach_prompt(coaching_data, phase_info, phase_recs):
     """
     race_info = get_race_info()
     # Build recovery status section based on available data
-    recovery_section = "RECOVERY STATUS:\n"
+    parts = ["RECOVERY STATUS:\n"]
     readiness = coaching_data['readiness']
     
     if 'resting_hr' in readiness:
         # Real wellness data available
-        recovery_section += f"- Resting HR: {readiness['resting_hr']} bpm (actual RHR)\n"
-        recovery_section += f"- Body Battery: {readiness['body_battery']}\n"
-        recovery_section += f"- Stress (avg): {readiness['stress_avg']}\n"
-        recovery_section += f"- Sleep Score: {readiness['sleep_score_avg']}\n"
-        recovery_section += f"- Data Source: {readiness['data_source']}\n"
+        parts.append(f"- Resting HR: {readiness['resting_hr']} bpm (actual RHR)\n")
+        parts.append(f"- Body Battery: {readiness['body_battery']}\n")
+        parts.append(f"- Stress (avg): {readiness['stress_avg']}\n")
+        parts.append(f"- Sleep Score: {readiness['sleep_score_avg']}\n")
+        parts.append(f"- Data Source: {readiness['data_source']}\n")
     else:
         # Fallback to activity HR
-        recovery_section += f"- HRV Status: {readiness.get('hrv_status', 'N/A')} ({readiness.get('hrv_deviation', 'N/A')})\n"
-        recovery_section += f"- Activity HR (avg): {readiness.get('avg_activity_hr', 'N/A')} bpm\n"
+        parts.append(f"- HRV Status: {readiness.get('hrv_status', 'N/A')} ({readiness.get('hrv_deviation', 'N/A')})\n")
+        parts.append(f"- Activity HR (avg): {readiness.get('avg_activity_hr', 'N/A')} bpm\n")
         if 'hr_note' in readiness:
-            recovery_section += f"  ⚠️ NOTE: {readiness['hr_note']}\n"
-        recovery_section += f"- Sleep Score: {readiness['sleep_score_avg']}\n"
+            parts.append(f"  ⚠️ NOTE: {readiness['hr_note']}\n")
+        parts.append(f"- Sleep Score: {readiness['sleep_score_avg']}\n")
+    recovery_section = ''.join(parts)
     
-    prompt = f"""I'm a triathlete using data-driven training. Please analyze my current state and help optimize my training plan.
+    parts = [f"""I'm a triathlete using data-driven training. Please analyze my current state and help optimize my training plan.
 
 📊 CURRENT TRAINING DATA:
 ========================
@@ -321,27 +383,20 @@ PERFORMANCE METRICS ({coaching_data['period']}):
 - Run Aerobic Decoupling: {coaching_data['performance']['run_decoupling']}
 - Swim SWOLF: {coaching_data['performance']['swim_swolf_avg']}
 - Bike Efficiency Trend: {coaching_data['performance']['bike_ef_trend']}
-"""
+"""]
 
     if race_info:
-        race_type_display = race_info['type'].replace('_', ' ').title()
+        race_type_name = race_info['type'].replace('_', ' ')
         
         # Add special description for Triple T
         if race_info['type'] == 'triple_t':
             race_type_display = "Triple T (Multi-Day Stage Race)"
-            race_details = """
-  Race Format - 4 triathlons in 3 days:
-    • Friday 6pm: Super Sprint (400m swim, 10mi bike, 2mi run)
-    • Saturday 8am: Sprint (750m swim, 20km bike, 5km run)
-    • Saturday 2pm: Sprint (750m swim, 20km bike, 5km run)
-    • Sunday 8am: Olympic (1500m swim, 40km bike, 10km run)
-  Total Distance: 3000m swim, 90km bike, 22km run
-  Key Challenge: Cumulative fatigue, 4-6hr recovery between races, heat management
-"""
+            race_details = PROMPT_TRIPLE_T_DETAILS
         else:
+            race_type_display = race_type_name.title()
             race_details = ""
         
-        prompt += f"""
+        parts.append(f"""
 🏁 RACE INFORMATION:
 ===================
 - Race Date: {race_info['date'].strftime('%B %d, %Y')} ({int(phase_info['weeks_to_race'])} weeks away)
@@ -353,75 +408,48 @@ CURRENT TRAINING PHASE: {phase_info['phase']}
 - Target Weekly TSS: {phase_recs['weekly_tss']}
 - Intensity Split: {phase_recs['intensity_split']}
 - Phase Focus: {phase_recs['focus']}
-"""
+""")
     else:
-        prompt += f"""
+        parts.append(f"""
 🏁 RACE INFORMATION:
 ===================
 - No race currently scheduled
 - Current Phase: {phase_info['phase']}
 - Training for general fitness
-"""
+""")
 
-    prompt += f"""
+    parts.append(f"""
 📝 CURRENT APP RECOMMENDATIONS:
 ==============================
 {chr(10).join(coaching_data['coaching_notes'])}
-
-🎯 WHAT I NEED FROM YOU:
-========================
-Please provide:
-
-1. **Immediate Next Steps** (this week):
-   - What TrainerRoad workout should I do tomorrow?
-   - Should I adjust volume or intensity based on my ACWR?
-   - Any red flags in my recovery metrics?
-
-2. **Medium-Term Plan** (next 4 weeks):
-"""
+""")
+    parts.append(PROMPT_REQUEST_HEADER)
 
     if race_info:
-        prompt += f"""   - Weekly TSS targets for {phase_info['phase']} phase
+        parts.append(f"""   - Weekly TSS targets for {phase_info['phase']} phase
    - Key workouts per week (how many hard days?)
    - When should I schedule recovery weeks?
    - Swim/bike/run volume distribution
-   - Race-specific workouts for {race_info['type'].replace('_', ' ')}
+   - Race-specific workouts for {race_type_name}
 
 3. **Long-Term Periodization** (to race day):
    - Phase breakdown with dates and focus
    - When to transition from {phase_info['phase']} to next phase?
    - Peak week timing and taper strategy
    - Race week protocol
-"""
+""")
     else:
-        prompt += f"""   - Should I set a goal race? If so, when and what distance?
-   - Weekly TSS targets for fitness maintenance
-   - How to balance swim/bike/run without a target race?
-   - Seasonal periodization suggestions
+        parts.append(PROMPT_NO_RACE_PLAN)
 
-3. **Long-Term Planning**:
-   - Should I plan a training season around A/B/C races?
-   - Off-season timing and focus
-"""
-
-    prompt += f"""
+    parts.append(f"""
 4. **Specific Concerns**:
    - My HR zone distribution shows {coaching_data['load']['distribution']['Z1_2']} in Zone 1-2 (need 80%). How to fix this?
    - Aerobic decoupling at {coaching_data['performance']['run_decoupling']} - what does this mean for my endurance?
    - Am I ready for high-intensity work, or should I build more base?
+""")
+    parts.append(PROMPT_FOOTER)
 
-5. **TrainerRoad Workout Selection**:
-   - Given my current phase and metrics, which specific workouts from TrainerRoad?
-   - How many hard days per week should I do?
-   - When to schedule endurance vs. sweet spot vs. tempo?
-
-COACHING PHILOSOPHY:
-I follow polarized training (80/20 rule) and use TrainerRoad for structured indoor cycling. I want to avoid overtraining and injury while making steady progress toward race fitness.
-
-Please be specific with dates, TSS numbers, and workout names. Thank you!
-"""
-
-    return prompt
+    return ''.join(parts)
 
 
 def main():
@@ -1,10 +1,24 @@
 #!/usr/bin/env python3
 """Test the settings dialog functionality"""
-import tkinter as tk
-from tkinter import ttk, messagebox
+import os
 from pathlib import Path
 
+def load_env(path=Path(".env")):
+    """Parse .env into a dict in a single pass"""
+    if not path.exists():
+        return {}
+    env = {}
+    for line in path.read_text(encoding='utf-8').splitlines():
+        key, sep, value = line.partition('=')
+        if sep and not key.startswith('#'):
+            env[key.strip()] = value.strip()
+    return env
+
 def test_settings_dialog():
+    # Imported here so importing load_env doesn't start up Tcl/Tk
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    
     root = tk.Tk()
     root.title("Settings Dialog Test")
     root.geometry("400x300")
@@ -30,13 +44,7 @@ def test_settings_dialog():
         
         # Read current value from .env
         env_path = Path(".env")
-        current_days = "60"  # default
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                for line in f:
-                    if line.startswith('ANALYSIS_DAYS='):
-                        current_days = line.split('=')[1].strip()
-                        break
+        current_days = load_env(env_path).get('ANALYSIS_DAYS', "60")
         
         ttk.Label(period_frame, text="Select how many days of training data to analyze:").pack(anchor=tk.W, pady=(0, 10))
         
@@ -69,20 +77,20 @@ def test_settings_dialog():
             
             # Update .env file
             if env_path.exists():
-                with open(env_path, 'r') as f:
-                    lines = f.readlines()
+                lines = env_path.read_text(encoding='utf-8').splitlines(keepends=True)
                 
                 # Find and update ANALYSIS_DAYS line
-                updated = False
                 for i, line in enumerate(lines):
                     if line.startswith('ANALYSIS_DAYS='):
                         lines[i] = f'ANALYSIS_DAYS={new_days}\n'
-                        updated = True
                         break
                 
-                # Write back
-                with open(env_path, 'w') as f:
-                    f.writelines(lines)
+                # Write to a temp file and swap it in so a crash can't truncate .env
+                tmp_path = env_path.with_name('.env.tmp')
+                tmp_path.write_text(''.join(lines), encoding='utf-8')
+                os.replace(tmp_path, env_path)
+                
+                status_label.config(text=f"Current: {new_days} days")
                 
                 messagebox.showinfo(
                     "✓ Settings Saved",
@@ -110,31 +118,11 @@ def test_settings_dialog():
     ttk.Button(root, text="⚙️ Open Settings", command=open_settings, width=20).pack(pady=10)
     
     # Show current setting
-    env_path = Path(".env")
-    current_days = "60"
-    if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                if line.startswith('ANALYSIS_DAYS='):
-                    current_days = line.split('=')[1].strip()
-                    break
+    current_days = load_env().get('ANALYSIS_DAYS', "60")
     
     status_label = ttk.Label(root, text=f"Current: {current_days} days", font=("Arial", 12))
     status_label.pack(pady=10)
     
-    def refresh_status():
-        env_path = Path(".env")
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                for line in f:
-                    if line.startswith('ANALYSIS_DAYS='):
-                        current_days = line.split('=')[1].strip()
-                        status_label.config(text=f"Current: {current_days} days")
-                        break
-        root.after(1000, refresh_status)
-    
-    refresh_status()
-    
     root.mainloop()
 
 if __name__ == "__main__":
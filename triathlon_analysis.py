@@ -6,15 +6,63 @@ Advanced analysis for triathlon training including recovery metrics, training lo
 
 import os
 from pathlib import Path
-from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from collections import defaultdict
 
 
 # Configuration
 DATA_DIR = Path(os.getenv('DATA_DIR', './data'))
 ACTIVITIES_CSV = DATA_DIR / 'activities.csv'
+ACTIVITIES_TRIATHLON_CACHE = DATA_DIR / 'activities_triathlon.pkl'
+NUMERIC_COLUMNS = ('distanceKm', 'durationMin', 'averageHR', 'maxHR', 'paceMinPerKm',
+                   'averageSpeed', 'averageRunningCadenceInStepsPerMinute')
+USECOLS = ('activityId', 'activityType', 'startTimeLocal') + NUMERIC_COLUMNS
+COLUMN_DTYPES = {**{col: 'float64' for col in NUMERIC_COLUMNS}, 'activityType': 'category'}
+# Case-insensitive activityType substrings per sport; the first matching sport wins
+SPORT_PATTERNS = {
+    'swim': 'swim',
+    'bike': 'cycling|bik',
+    'run': 'run',
+}
+SPORT_SUMMARY_FUNCS = {
+    'distanceKm': ['sum', 'mean'],
+    'paceMinPerKm': ['mean'],
+    'averageSpeed': ['mean'],
+    'averageRunningCadenceInStepsPerMinute': ['mean'],
+}
+
+
+def read_activities_csv():
+    """
+    Parse the columns the triathlon analysis and charts use from activities.csv.
+    
+    The parsed frame is pickled next to the CSV and reused while it is newer
+    than both the CSV and this module, so repeat runs skip text and datetime
+    parsing. Derived date columns are added by the callers.
+    """
+    source_mtime = max(ACTIVITIES_CSV.stat().st_mtime, Path(__file__).stat().st_mtime)
+    if ACTIVITIES_TRIATHLON_CACHE.exists() and ACTIVITIES_TRIATHLON_CACHE.stat().st_mtime >= source_mtime:
+        try:
+            return pd.read_pickle(ACTIVITIES_TRIATHLON_CACHE)
+        except Exception:
+            pass  # Unreadable cache - rebuild it from the CSV
+    
+    # Fixed dtypes up front so pandas doesn't have to infer them column by column
+    df = pd.read_csv(ACTIVITIES_CSV, usecols=lambda c: c in USECOLS, dtype=COLUMN_DTYPES)
+    if 'startTimeLocal' in df.columns:
+        df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'])
+    
+    # Temp file + rename: analysis stages run side by side and may rebuild the
+    # cache at the same time, and a reader must never see a half-written pickle
+    tmp_path = ACTIVITIES_TRIATHLON_CACHE.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, ACTIVITIES_TRIATHLON_CACHE)
+    except OSError as e:
+        print(f"  Warning: Could not write cache {ACTIVITIES_TRIATHLON_CACHE}: {e}")
+        tmp_path.unlink(missing_ok=True)
+    
+    return df
 
 
 def load_activities():
@@ -25,13 +73,21 @@ def load_activities():
         return None
     
     print(f"Loading data from {ACTIVITIES_CSV}...")
-    df = pd.read_csv(ACTIVITIES_CSV)
+    df = read_activities_csv()
     
-    # Convert date column
+    # Derive the date column (weeks are derived where they are summarised)
     if 'startTimeLocal' in df.columns:
-        df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'])
-        df['date'] = df['startTimeLocal'].dt.date
-        df['week'] = df['startTimeLocal'].dt.to_period('W')
+        df['date'] = df['startTimeLocal'].dt.normalize()
+    
+    # Label each activity swim/bike/run/other once so sport filters are a plain equality test.
+    # Patterns are only matched against the distinct activity types, not every row.
+    if 'activityType' in df.columns:
+        categories = df['activityType'].cat.categories.astype(str)
+        sport_by_type = {}
+        for sport, pattern in SPORT_PATTERNS.items():
+            for activity_type in categories[categories.str.contains(pattern, case=False)]:
+                sport_by_type.setdefault(activity_type, sport)
+        df['sport'] = df['activityType'].map(sport_by_type).fillna('other').astype('category')
     
     print(f"✓ Loaded {len(df)} activities")
     return df
@@ -54,21 +110,23 @@ def calculate_training_stress_score(df):
     if 'averageHR' in df.columns and df['averageHR'].notna().any():
         # Use HR-based TSS estimation
         # Assumes max HR of 185 (adjust based on your data)
-        max_hr = df['maxHR'].max() if 'maxHR' in df.columns else 185
+        max_hr = df['maxHR'].max() if 'maxHR' in df.columns else np.nan
+        if not max_hr >= 100:  # No usable max HR recorded (all missing or implausibly low)
+            max_hr = 185
         threshold_hr = max_hr * 0.85  # Approximate threshold
         
-        for idx, row in df.iterrows():
-            if pd.notna(row['averageHR']) and pd.notna(row['durationMin']):
-                intensity_factor = row['averageHR'] / threshold_hr
-                tss = (row['durationMin'] / 60) * intensity_factor ** 2 * 100
-                df.at[idx, 'estimated_tss'] = tss
+        # Rows missing HR or duration keep a TSS of 0
+        has_data = df['averageHR'].notna() & df['durationMin'].notna()
+        intensity_factor = df['averageHR'] / threshold_hr
+        tss = (df['durationMin'] / 60) * intensity_factor ** 2 * 100
+        df['estimated_tss'] = tss.where(has_data, 0.0)
     else:
         # Duration-based estimation (rough approximation)
         df['estimated_tss'] = df['durationMin'] * 0.8
     
     # Calculate weekly TSS
-    if 'week' in df.columns:
-        weekly_tss = df.groupby('week')['estimated_tss'].sum()
+    if 'startTimeLocal' in df.columns:
+        weekly_tss = df.groupby(df['startTimeLocal'].dt.to_period('W'))['estimated_tss'].sum()
         print("\nWeekly Training Stress:")
         for week, tss in weekly_tss.tail(8).items():
             print(f"  Week {week}: {tss:.0f} TSS")
@@ -88,18 +146,25 @@ def calculate_training_load_balance(df):
     # Sort by date
     df_sorted = df.sort_values('startTimeLocal')
     
-    # Calculate rolling averages
-    # Acute Load: 7-day average
-    # Chronic Load: 42-day average (6 weeks)
-    df_sorted['acute_load'] = df_sorted['estimated_tss'].rolling(window=7, min_periods=1).mean()
-    df_sorted['chronic_load'] = df_sorted['estimated_tss'].rolling(window=42, min_periods=7).mean()
+    # Total TSS per calendar day, with rest days as 0, so the load windows
+    # span days rather than activities
+    day = df_sorted['startTimeLocal'].dt.normalize()
+    daily_tss = df_sorted.groupby(day)['estimated_tss'].sum().asfreq('D', fill_value=0.0)
+    
+    # Calculate exponentially weighted averages
+    # Acute Load: 7-day
+    # Chronic Load: 42-day (6 weeks)
+    acute_load = daily_tss.ewm(span=7, adjust=False).mean()
+    chronic_load = daily_tss.ewm(span=42, min_periods=7, adjust=False).mean()
+    df_sorted['acute_load'] = acute_load.reindex(day).to_numpy()
+    df_sorted['chronic_load'] = chronic_load.reindex(day).to_numpy()
     
     # Training Stress Balance (TSB) = Chronic - Acute
     # Positive TSB = Fresh, Negative TSB = Fatigued
     df_sorted['tsb'] = df_sorted['chronic_load'] - df_sorted['acute_load']
     
     # Acute:Chronic Workload Ratio (ACWR)
-    df_sorted['acwr'] = df_sorted['acute_load'] / df_sorted['chronic_load']
+    df_sorted['acwr'] = df_sorted['acute_load'] / df_sorted['chronic_load'].replace(0, np.nan)
     
     # Show recent trends
     recent = df_sorted.tail(10)
@@ -109,21 +174,17 @@ def calculate_training_load_balance(df):
     ))
     print("-" * 60)
     
-    for _, row in recent.iterrows():
-        if pd.notna(row.get('date')):
+    columns = ['date', 'acute_load', 'chronic_load', 'tsb', 'acwr']
+    for date, acute, chronic, tsb, acwr in recent[columns].itertuples(index=False, name=None):
+        if pd.notna(date):
             print("{:<12} {:<12.0f} {:<12.0f} {:<12.0f} {:<10.2f}".format(
-                str(row['date']),
-                row.get('acute_load', 0),
-                row.get('chronic_load', 0),
-                row.get('tsb', 0),
-                row.get('acwr', 0)
+                date.strftime('%Y-%m-%d'), acute, chronic, tsb, acwr
             ))
     
     # Interpret current status
     if len(recent) > 0:
-        latest = recent.iloc[-1]
-        tsb = latest.get('tsb', 0)
-        acwr = latest.get('acwr', 0)
+        tsb = recent['tsb'].iat[-1]
+        acwr = recent['acwr'].iat[-1]
         
         print("\n" + "="*60)
         print("CURRENT TRAINING STATUS")
@@ -157,21 +218,24 @@ def analyze_sport_specific_metrics(df):
     print("SPORT-SPECIFIC PERFORMANCE METRICS")
     print("="*60)
     
-    # Swimming Analysis
-    swim_types = ['lap_swimming', 'open_water_swimming']
-    swim_data = df[df['activityType'].isin(swim_types)]
+    # Per-sport session counts, totals and averages in one grouped pass
+    sport_groups = df.groupby('sport', observed=True)
+    sessions = sport_groups.size()
+    summary = sport_groups.agg({col: funcs for col, funcs in SPORT_SUMMARY_FUNCS.items() if col in df.columns})
     
-    if len(swim_data) > 0:
+    # Swimming Analysis
+    if sessions.get('swim', 0) > 0:
+        swim_data = df[df['sport'] == 'swim']
         print("\n🏊 SWIMMING:")
-        print(f"  Total sessions: {len(swim_data)}")
-        if 'distanceKm' in swim_data.columns:
-            total_swim = swim_data['distanceKm'].sum()
-            avg_session = swim_data['distanceKm'].mean()
+        print(f"  Total sessions: {sessions['swim']}")
+        if 'distanceKm' in df.columns:
+            total_swim = summary.at['swim', ('distanceKm', 'sum')]
+            avg_session = summary.at['swim', ('distanceKm', 'mean')]
             print(f"  Total distance: {total_swim:.2f} km")
             print(f"  Avg per session: {avg_session:.2f} km")
         
-        if 'paceMinPerKm' in swim_data.columns:
-            avg_pace = swim_data['paceMinPerKm'].mean()
+        if 'paceMinPerKm' in df.columns:
+            avg_pace = summary.at['swim', ('paceMinPerKm', 'mean')]
             if pd.notna(avg_pace) and avg_pace < 100:
                 # Convert to pace per 100m
                 pace_per_100m = avg_pace / 10
@@ -186,57 +250,50 @@ def analyze_sport_specific_metrics(df):
                 print(f"  Pace trend: {improvement:+.1f}% (recent vs early)")
     
     # Cycling Analysis
-    bike_types = ['cycling', 'road_biking', 'indoor_cycling', 'mountain_biking']
-    bike_data = df[df['activityType'].isin(bike_types)]
-    
-    if len(bike_data) > 0:
+    if sessions.get('bike', 0) > 0:
+        bike_data = df[df['sport'] == 'bike']
         print("\n🚴 CYCLING:")
-        print(f"  Total sessions: {len(bike_data)}")
-        if 'distanceKm' in bike_data.columns:
-            total_bike = bike_data['distanceKm'].sum()
-            avg_session = bike_data['distanceKm'].mean()
+        print(f"  Total sessions: {sessions['bike']}")
+        if 'distanceKm' in df.columns:
+            total_bike = summary.at['bike', ('distanceKm', 'sum')]
+            avg_session = summary.at['bike', ('distanceKm', 'mean')]
             print(f"  Total distance: {total_bike:.2f} km")
             print(f"  Avg per session: {avg_session:.2f} km")
         
-        if 'averageSpeed' in bike_data.columns:
+        if 'averageSpeed' in df.columns:
             # Convert m/s to km/h
-            bike_data_copy = bike_data.copy()
-            bike_data_copy['speed_kmh'] = bike_data_copy['averageSpeed'] * 3.6
-            avg_speed = bike_data_copy['speed_kmh'].mean()
+            avg_speed = summary.at['bike', ('averageSpeed', 'mean')] * 3.6
             print(f"  Avg speed: {avg_speed:.1f} km/h")
         
         # HR efficiency (if available)
         if 'averageHR' in bike_data.columns and 'averageSpeed' in bike_data.columns:
-            bike_data_copy = bike_data[bike_data['averageHR'].notna() & bike_data['averageSpeed'].notna()].copy()
-            if len(bike_data_copy) > 0:
-                bike_data_copy['hr_efficiency'] = bike_data_copy['averageSpeed'] / bike_data_copy['averageHR']
-                avg_efficiency = bike_data_copy['hr_efficiency'].mean()
+            # NaN where either value is missing, which the mean skips
+            hr_efficiency = bike_data['averageSpeed'] / bike_data['averageHR']
+            if hr_efficiency.notna().any():
+                avg_efficiency = hr_efficiency.mean()
                 print(f"  HR efficiency: {avg_efficiency:.3f} (m/s per bpm)")
     
     # Running Analysis
-    run_types = ['running', 'treadmill_running', 'trail_running', 'track_running']
-    run_data = df[df['activityType'].isin(run_types)]
-    
-    if len(run_data) > 0:
+    if sessions.get('run', 0) > 0:
+        run_data = df[df['sport'] == 'run']
         print("\n🏃 RUNNING:")
-        print(f"  Total sessions: {len(run_data)}")
-        if 'distanceKm' in run_data.columns:
-            total_run = run_data['distanceKm'].sum()
-            avg_session = run_data['distanceKm'].mean()
+        print(f"  Total sessions: {sessions['run']}")
+        if 'distanceKm' in df.columns:
+            total_run = summary.at['run', ('distanceKm', 'sum')]
+            avg_session = summary.at['run', ('distanceKm', 'mean')]
             print(f"  Total distance: {total_run:.2f} km")
             print(f"  Avg per session: {avg_session:.2f} km")
         
-        if 'paceMinPerKm' in run_data.columns:
+        if 'paceMinPerKm' in df.columns:
             valid_pace = run_data[run_data['paceMinPerKm'].notna() & (run_data['paceMinPerKm'] < 15)]
             if len(valid_pace) > 0:
                 avg_pace = valid_pace['paceMinPerKm'].mean()
                 print(f"  Avg pace: {int(avg_pace)}:{int((avg_pace % 1) * 60):02d} min/km")
         
-        # Cadence analysis
-        if 'averageRunningCadenceInStepsPerMinute' in run_data.columns:
-            valid_cadence = run_data[run_data['averageRunningCadenceInStepsPerMinute'].notna()]
-            if len(valid_cadence) > 0:
-                avg_cadence = valid_cadence['averageRunningCadenceInStepsPerMinute'].mean()
+        # Cadence analysis (the mean skips runs without cadence; NaN if there are none)
+        if 'averageRunningCadenceInStepsPerMinute' in df.columns:
+            avg_cadence = summary.at['run', ('averageRunningCadenceInStepsPerMinute', 'mean')]
+            if pd.notna(avg_cadence):
                 print(f"  Avg cadence: {avg_cadence:.0f} spm")
                 if avg_cadence < 170:
                     print("    💡 Tip: Target 180 spm for improved efficiency")
@@ -250,13 +307,13 @@ def analyze_recovery_readiness(df):
     
     # Check for rest days
     if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'])
-        all_dates = pd.date_range(start=df['date'].min(), end=df['date'].max())
-        activity_dates = df['date'].unique()
-        rest_days = len(all_dates) - len(activity_dates)
+        # Whole days as datetime64[D]; activities without a start time are skipped
+        dates = df['date'].dropna().to_numpy(dtype='datetime64[D]')
+        total_days = int((dates.max() - dates.min()) // np.timedelta64(1, 'D')) + 1
+        rest_days = total_days - np.unique(dates).size
         
-        print(f"\nRest Days: {rest_days} out of {len(all_dates)} total days")
-        rest_percentage = (rest_days / len(all_dates)) * 100
+        print(f"\nRest Days: {rest_days} out of {total_days} total days")
+        rest_percentage = (rest_days / total_days) * 100
         print(f"Recovery ratio: {rest_percentage:.1f}%")
         
         if rest_percentage < 10:
@@ -289,7 +346,12 @@ def analyze_recovery_readiness(df):
 
 
 def generate_training_recommendations(df):
-    """Generate adaptive training recommendations based on load and recovery."""
+    """
+    Generate adaptive training recommendations based on load and recovery.
+    
+    Expects the frame returned by calculate_training_load_balance, which is
+    already sorted by start time.
+    """
     print("\n" + "="*60)
     print("ADAPTIVE TRAINING RECOMMENDATIONS")
     print("="*60)
@@ -300,12 +362,10 @@ def generate_training_recommendations(df):
     if 'tsb' not in df.columns:
         df = calculate_training_load_balance(df)
     
-    # Get most recent status
-    df_sorted = df.sort_values('startTimeLocal')
-    if len(df_sorted) > 0:
-        latest = df_sorted.iloc[-1]
-        tsb = latest.get('tsb', 0)
-        acwr = latest.get('acwr', 1.0)
+    # Get most recent status (the load balance frame is sorted by start time)
+    if len(df) > 0:
+        tsb = df['tsb'].iat[-1]
+        acwr = df['acwr'].iat[-1]
         
         print("\nBased on your current training load:\n")
         
@@ -351,11 +411,11 @@ def generate_training_recommendations(df):
         print("Next Week's Focus Areas:")
         
         # Analyze recent activity distribution
-        recent_week = df_sorted[df_sorted['startTimeLocal'] >= (df_sorted['startTimeLocal'].max() - pd.Timedelta(days=7))]
+        recent_week = df[df['startTimeLocal'] >= (df['startTimeLocal'].max() - pd.Timedelta(days=7))]
         
-        swim_count = len(recent_week[recent_week['activityType'].str.contains('swim', case=False, na=False)])
-        bike_count = len(recent_week[recent_week['activityType'].str.contains('cycling|bike', case=False, na=False)])
-        run_count = len(recent_week[recent_week['activityType'].str.contains('running|run', case=False, na=False)])
+        swim_count = (recent_week['sport'] == 'swim').sum()
+        bike_count = (recent_week['sport'] == 'bike').sum()
+        run_count = (recent_week['sport'] == 'run').sum()
         
         total_workouts = len(recent_week)
         
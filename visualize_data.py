@@ -5,22 +5,45 @@ Creates charts and graphs from Garmin activity data.
 """
 
 import os
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import pandas as pd
+import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
+# Figures are built directly rather than through pyplot, so nothing is left
+# in pyplot's figure registry between charts
+from matplotlib.figure import Figure
+from triathlon_analysis import read_activities_csv
 
 # Configuration
 DATA_DIR = Path(os.getenv('DATA_DIR', './data'))
 ACTIVITIES_CSV = DATA_DIR / 'activities.csv'
 OUTPUT_DIR = DATA_DIR / 'visualizations'
+PLOT_DPI = int(os.getenv('PLOT_DPI', '100'))  # 150 for sharper (but slower to encode) charts
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
+# Set style: seaborn's "whitegrid" look as plain rcParams, so seaborn isn't needed at import
+CHART_STYLE = {
+    'axes.grid': True,
+    'axes.axisbelow': True,
+    'axes.facecolor': 'white',
+    'axes.edgecolor': '.8',
+    'axes.labelcolor': '.15',
+    'grid.color': '.8',
+    'grid.linestyle': '-',
+    'text.color': '.15',
+    'xtick.color': '.15',
+    'ytick.color': '.15',
+    'xtick.bottom': False,
+    'ytick.left': False,
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'Bitstream Vera Sans', 'sans-serif'],
+    'lines.solid_capstyle': 'round',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+    'figure.figsize': (12, 6),
+}
+matplotlib.rcParams.update(CHART_STYLE)
 
 
 def load_activities():
@@ -31,15 +54,12 @@ def load_activities():
         return None
     
     print(f"Loading data from {ACTIVITIES_CSV}...")
-    df = pd.read_csv(ACTIVITIES_CSV)
+    # Shares the parsed-CSV cache with the triathlon analysis
+    df = read_activities_csv()
     
-    # Convert date column
+    # Derive the date column; month and weekday are derived by the charts that use them
     if 'startTimeLocal' in df.columns:
-        df['startTimeLocal'] = pd.to_datetime(df['startTimeLocal'])
-        df['date'] = df['startTimeLocal'].dt.date
-        df['month'] = df['startTimeLocal'].dt.to_period('M')
-        df['week'] = df['startTimeLocal'].dt.to_period('W')
-        df['dayOfWeek'] = df['startTimeLocal'].dt.day_name()
+        df['date'] = df['startTimeLocal'].dt.normalize()
     
     print(f"✓ Loaded {len(df)} activities")
     return df
@@ -51,11 +71,11 @@ def plot_activity_timeline(df):
         return
     
     print("Creating activity timeline...")
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+    fig = Figure(figsize=(14, 10))
+    ax1, ax2 = fig.subplots(2, 1)
     
     # Distance over time
     daily = df.groupby('date')['distanceKm'].sum().reset_index()
-    daily['date'] = pd.to_datetime(daily['date'])
     
     ax1.plot(daily['date'], daily['distanceKm'], marker='o', linewidth=2, markersize=6)
     ax1.set_title('Daily Distance Over Time', fontsize=16, fontweight='bold')
@@ -65,7 +85,6 @@ def plot_activity_timeline(df):
     
     # Activity count over time
     activity_counts = df.groupby('date').size().reset_index(name='count')
-    activity_counts['date'] = pd.to_datetime(activity_counts['date'])
     
     ax2.bar(activity_counts['date'], activity_counts['count'], alpha=0.7, color='steelblue')
     ax2.set_title('Number of Activities per Day', fontsize=16, fontweight='bold')
@@ -73,25 +92,25 @@ def plot_activity_timeline(df):
     ax2.set_ylabel('Number of Activities', fontsize=12)
     ax2.grid(True, alpha=0.3, axis='y')
     
-    plt.tight_layout()
-    save_plot('activity_timeline.png')
-    plt.close()
+    fig.tight_layout()
+    save_plot(fig, 'activity_timeline.png')
 
 
 def plot_monthly_trends(df):
     """Plot monthly activity trends."""
-    if 'month' not in df.columns:
+    if 'startTimeLocal' not in df.columns:
         return
     
     print("Creating monthly trends chart...")
     
-    monthly = df.groupby('month').agg({
+    monthly = df.groupby(df['startTimeLocal'].dt.to_period('M')).agg({
         'activityId': 'count',
         'distanceKm': 'sum',
         'durationMin': 'sum'
     }).rename(columns={'activityId': 'count'})
     
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    fig = Figure(figsize=(18, 5))
+    axes = fig.subplots(1, 3)
     
     # Activity count
     monthly['count'].plot(kind='bar', ax=axes[0], color='steelblue', alpha=0.7)
@@ -114,9 +133,8 @@ def plot_monthly_trends(df):
     axes[2].set_ylabel('Time (hours)', fontsize=11)
     axes[2].tick_params(axis='x', rotation=45)
     
-    plt.tight_layout()
-    save_plot('monthly_trends.png')
-    plt.close()
+    fig.tight_layout()
+    save_plot(fig, 'monthly_trends.png')
 
 
 def plot_activity_types(df):
@@ -126,27 +144,30 @@ def plot_activity_types(df):
     
     print("Creating activity type charts...")
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
-    # Count by activity type
-    type_counts = df['activityType'].value_counts()
-    colors = sns.color_palette("husl", len(type_counts))
+    # Count by activity type (the grouping is reused for the distance totals below)
+    type_groups = df.groupby('activityType', observed=True)
+    type_counts = type_groups.size().sort_values(ascending=False)
+    colors = [tuple(c) for c in matplotlib.colormaps['hsv'](np.linspace(0, 1, len(type_counts), endpoint=False))]
     
-    ax1.pie(type_counts.values, labels=type_counts.index, autopct='%1.1f%%',
-            colors=colors, startangle=90)
+    # Label each wedge with its share up front; slivers under 1% stay unlabelled
+    shares = type_counts.to_numpy() / type_counts.sum() * 100
+    labels = [f"{name}\n{share:.1f}%" if share >= 1 else "" for name, share in zip(type_counts.index, shares)]
+    ax1.pie(type_counts.values, labels=labels, colors=colors, startangle=90)
     ax1.set_title('Activity Type Distribution (by count)', fontsize=14, fontweight='bold')
     
     # Distance by activity type
     if 'distanceKm' in df.columns:
-        type_distance = df.groupby('activityType')['distanceKm'].sum().sort_values(ascending=False)
+        type_distance = type_groups['distanceKm'].sum().sort_values(ascending=False)
         type_distance.plot(kind='barh', ax=ax2, color=colors, alpha=0.7)
         ax2.set_title('Total Distance by Activity Type', fontsize=14, fontweight='bold')
         ax2.set_xlabel('Distance (km)', fontsize=11)
         ax2.set_ylabel('Activity Type', fontsize=11)
     
-    plt.tight_layout()
-    save_plot('activity_types.png')
-    plt.close()
+    fig.tight_layout()
+    save_plot(fig, 'activity_types.png')
 
 
 def plot_heart_rate_analysis(df):
@@ -157,7 +178,8 @@ def plot_heart_rate_analysis(df):
     
     print("Creating heart rate analysis...")
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Heart rate distribution
     df_hr = df[df['averageHR'].notna()]
@@ -173,7 +195,6 @@ def plot_heart_rate_analysis(df):
     # Heart rate over time
     if 'date' in df.columns:
         hr_by_date = df_hr.groupby('date')['averageHR'].mean().reset_index()
-        hr_by_date['date'] = pd.to_datetime(hr_by_date['date'])
         ax2.plot(hr_by_date['date'], hr_by_date['averageHR'], 
                 marker='o', linewidth=2, markersize=5, color='red')
         ax2.set_title('Average Heart Rate Over Time', fontsize=14, fontweight='bold')
@@ -181,9 +202,8 @@ def plot_heart_rate_analysis(df):
         ax2.set_ylabel('Average Heart Rate (bpm)', fontsize=11)
         ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    save_plot('heart_rate_analysis.png')
-    plt.close()
+    fig.tight_layout()
+    save_plot(fig, 'heart_rate_analysis.png')
 
 
 def plot_pace_analysis(df):
@@ -203,7 +223,8 @@ def plot_pace_analysis(df):
         print("No valid pace data available")
         return
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Pace distribution
     ax1.hist(df_pace['paceMinPerKm'], bins=20, color='green', alpha=0.7, edgecolor='black')
@@ -225,22 +246,22 @@ def plot_pace_analysis(df):
         ax2.set_ylabel('Pace (min/km)', fontsize=11)
         ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    save_plot('pace_analysis.png')
-    plt.close()
+    fig.tight_layout()
+    save_plot(fig, 'pace_analysis.png')
 
 
 def plot_weekly_pattern(df):
     """Plot weekly activity patterns."""
-    if 'dayOfWeek' not in df.columns:
+    if 'startTimeLocal' not in df.columns:
         return
     
     print("Creating weekly pattern chart...")
     
     day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_counts = df['dayOfWeek'].value_counts().reindex(day_order, fill_value=0)
+    day_counts = df['startTimeLocal'].dt.day_name().value_counts().reindex(day_order, fill_value=0)
     
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
     
     colors = ['red' if day in ['Saturday', 'Sunday'] else 'steelblue' for day in day_order]
     day_counts.plot(kind='bar', ax=ax, color=colors, alpha=0.7, edgecolor='black')
@@ -251,19 +272,36 @@ def plot_weekly_pattern(df):
     ax.tick_params(axis='x', rotation=45)
     ax.grid(True, alpha=0.3, axis='y')
     
-    plt.tight_layout()
-    save_plot('weekly_pattern.png')
-    plt.close()
+    fig.tight_layout()
+    save_plot(fig, 'weekly_pattern.png')
 
 
-def save_plot(filename):
-    """Save the current plot to file."""
+def save_plot(fig, filename):
+    """Save a figure to file."""
     OUTPUT_DIR.mkdir(exist_ok=True)
     filepath = OUTPUT_DIR / filename
-    plt.savefig(filepath, dpi=150, bbox_inches='tight')
+    fig.savefig(filepath, dpi=PLOT_DPI, bbox_inches='tight')
     print(f"  ✓ Saved: {filepath}")
 
 
+PLOT_FUNCTIONS = (
+    plot_activity_timeline,
+    plot_monthly_trends,
+    plot_activity_types,
+    plot_heart_rate_analysis,
+    plot_pace_analysis,
+    plot_weekly_pattern,
+)
+
+
+def render_plot(plot_func, df):
+    """Run one plot function in a worker process and return what it printed."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        plot_func(df)
+    return output.getvalue()
+
+
 def main():
     """Main execution function."""
     print("=" * 60)
@@ -278,13 +316,16 @@ def main():
     print("\nGenerating visualizations...")
     print("(Charts will be displayed and saved to data/visualizations/)\n")
     
-    # Create visualizations
-    plot_activity_timeline(df)
-    plot_monthly_trends(df)
-    plot_activity_types(df)
-    plot_heart_rate_analysis(df)
-    plot_pace_analysis(df)
-    plot_weekly_pattern(df)
+    # Create visualizations. The charts are independent, so with more than one
+    # CPU each is rendered in its own process; messages still print in order
+    workers = min(len(PLOT_FUNCTIONS), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for output in pool.map(render_plot, PLOT_FUNCTIONS, [df] * len(PLOT_FUNCTIONS)):
+                print(output, end='')
+    else:
+        for plot_func in PLOT_FUNCTIONS:
+            plot_func(df)
     
     print("\n" + "="*60)
     print("✓ Visualization complete!")